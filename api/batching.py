@@ -0,0 +1,168 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+
+from src.logger import logging
+from api.executor import Overloaded
+
+
+_STOPPED = "prediction service is shutting down"
+
+
+@dataclass
+class MicroBatcherConfig:
+    enabled: bool = os.getenv("PREDICT_MICRO_BATCHING", "1") == "1"
+    max_batch_size: int = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "64"))
+    max_wait_ms: float = float(os.getenv("PREDICT_BATCH_MAX_WAIT_MS", "2"))
+    # rows allowed to wait for a batch before new requests are refused
+    max_queued: int = int(os.getenv("PREDICT_MAX_QUEUED", "4096"))
+    # batches scored at once; like the inference pool, one per core
+    max_in_flight: int = int(os.getenv("PREDICT_BATCH_MAX_IN_FLIGHT", "0")) or (os.cpu_count() or 1)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row requests into one vectorized call.
+
+    A batch is flushed when it reaches max_batch_size rows or when its
+    oldest request has waited max_wait_ms, whichever comes first. The
+    batch function runs off the event loop, up to max_in_flight batches at
+    a time, and each caller gets its own row of the result back.
+    """
+
+    def __init__(self, batch_fn, config: MicroBatcherConfig = None, executor=None):
+        self.batch_fn = batch_fn
+        self.config = config or MicroBatcherConfig()
+        self.executor = executor
+        self._queue = None
+        self._worker = None
+        self._slots = None
+        self._in_flight = set()
+
+        self.batches = 0
+        self.rows = 0
+        self.full_batches = 0
+        self.timeout_batches = 0
+        self.rejected = 0
+
+    def start(self):
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.config.max_in_flight)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is None:
+            return
+        tasks = [self._worker, *self._in_flight]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._worker = None
+
+        # nobody will score what is still queued; fail it instead of leaving callers waiting
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            self._fail([future], Overloaded(_STOPPED))
+
+    @staticmethod
+    def _fail(futures, error):
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+    async def submit(self, item):
+        if self._worker is None:
+            self.start()
+        if self._queue.qsize() >= self.config.max_queued:
+            self.rejected += 1
+            raise Overloaded(f"{self._queue.qsize()} predictions already queued")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self, batch):
+        batch.append(await self._queue.get())
+        deadline = time.monotonic() + self.config.max_wait_ms / 1000
+
+        while len(batch) < self.config.max_batch_size:
+            # take whatever is already queued without yielding first
+            while not self._queue.empty() and len(batch) < self.config.max_batch_size:
+                batch.append(self._queue.get_nowait())
+            if len(batch) >= self.config.max_batch_size:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # wait for a free slot first: requests keep queueing meanwhile,
+            # so the next batch fills up instead of going out half empty
+            await self._slots.acquire()
+            batch = []
+            try:
+                await self._collect(batch)
+            except asyncio.CancelledError:
+                self._slots.release()
+                self._fail([future for _, future in batch], Overloaded(_STOPPED))
+                raise
+
+            self.batches += 1
+            self.rows += len(batch)
+            if len(batch) >= self.config.max_batch_size:
+                self.full_batches += 1
+            else:
+                self.timeout_batches += 1
+
+            task = loop.create_task(self._score(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _score(self, batch):
+        items = [item for item, _ in batch]
+        futures = [future for _, future in batch]
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self.executor, self.batch_fn, items)
+        except asyncio.CancelledError:
+            self._fail(futures, Overloaded(_STOPPED))
+            raise
+        except Exception as e:
+            logging.error(f"micro-batch of {len(items)} rows failed: {e}")
+            self._fail(futures, e)
+            return
+        finally:
+            self._slots.release()
+
+        for future, result in zip(futures, results):
+            # caller may have gone away (client disconnect -> cancelled)
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            "enabled": self.config.enabled,
+            "max_batch_size": self.config.max_batch_size,
+            "max_wait_ms": self.config.max_wait_ms,
+            "batches": self.batches,
+            "rows": self.rows,
+            "full_batches": self.full_batches,
+            "timeout_batches": self.timeout_batches,
+            "rejected": self.rejected,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "in_flight": len(self._in_flight),
+            "max_in_flight": self.config.max_in_flight,
+            "average_batch_size": self.rows / self.batches if self.batches else 0.0,
+            # rows per batch relative to max_batch_size
+            "batch_fill_ratio": (
+                self.rows / (self.batches * self.config.max_batch_size)
+                if self.batches else 0.0
+            )
+        }
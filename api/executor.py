@@ -0,0 +1,73 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+
+class Overloaded(Exception):
+    """Raised instead of queueing when the service is already at capacity."""
+
+
+@dataclass
+class InferencePoolConfig:
+    # pandas, sklearn and XGBoost release the GIL in their hot loops, so one
+    # thread per core keeps every core busy; api/main.py caps the model's own
+    # threads to match (MODEL_THREADS) so the two don't multiply
+    workers: int = int(os.getenv("INFERENCE_WORKERS", os.cpu_count() or 1))
+    # bulk requests admitted at once (running + waiting for a worker)
+    max_pending: int = int(os.getenv("INFERENCE_MAX_PENDING", "0")) or 2 * (os.cpu_count() or 1)
+
+
+class InferencePool:
+    """
+    Dedicated, bounded executor for scoring work.
+
+    Inference never runs on the event loop or on Starlette's shared
+    threadpool, so cheap endpoints like /health stay responsive. Requests
+    past max_pending are refused with Overloaded rather than queued.
+    """
+
+    def __init__(self, config: InferencePoolConfig = None):
+        self.config = config or InferencePoolConfig()
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.config.workers, thread_name_prefix="inference"
+        )
+        self.pending = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def admit(self):
+        # single event loop thread, so the counter needs no lock
+        if self.pending >= self.config.max_pending:
+            self.rejected += 1
+            raise Overloaded(f"{self.pending} bulk requests already in progress")
+        self.pending += 1
+        try:
+            yield self
+        finally:
+            self.pending -= 1
+
+    async def run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def iterate(self, iterator):
+        # drive a blocking generator from async code, one next() per worker hop
+        loop = asyncio.get_running_loop()
+        done = object()
+        while True:
+            item = await loop.run_in_executor(self.executor, next, iterator, done)
+            if item is done:
+                return
+            yield item
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        return {
+            "workers": self.config.workers,
+            "max_pending": self.config.max_pending,
+            "pending": self.pending,
+            "rejected": self.rejected
+        }
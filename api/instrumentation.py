@@ -0,0 +1,67 @@
+import time
+
+from src.metrics import REGISTRY
+
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "churn_http_requests_total",
+    "HTTP requests handled, by route template and status.",
+    ["method", "route", "status"]
+)
+HTTP_SECONDS = REGISTRY.histogram(
+    "churn_http_request_duration_seconds",
+    "Request time until the last body byte is sent, streaming included.",
+    ["method", "route"]
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "churn_http_requests_in_flight",
+    "HTTP requests currently being handled.",
+    ["method"]
+)
+INFERENCE_PENDING = REGISTRY.gauge(
+    "churn_inference_pending",
+    "Bulk requests admitted to the inference pool."
+)
+BATCHER_QUEUED = REGISTRY.gauge(
+    "churn_batcher_queued_rows",
+    "Single-customer rows waiting for a micro-batch."
+)
+LOG_RECORDS_DROPPED = REGISTRY.gauge(
+    "churn_log_records_dropped",
+    "Log records dropped because the log writer queue was full."
+)
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware (no BaseHTTPMiddleware) so streamed responses are
+    timed to their last chunk and nothing is buffered.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # route template, not the raw path, keeps /score/{customer_id} one series
+            route = scope.get("route")
+            route = getattr(route, "path", "unmatched")
+            HTTP_SECONDS.observe(time.perf_counter() - start, method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=status["code"])
+            HTTP_IN_FLIGHT.dec(method=method)
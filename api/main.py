@@ -1,65 +1,592 @@
-from fastapi import FastAPI, UploadFile, File
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 import pandas as pd
 import io
+import os
+import asyncio
 
 from src.pipeline.predict_pipeline import PredictPipeline
-from src.analytics.kpi import ChurnKPI
+from src.analytics.kpi import ChurnKPI, ChurnKPIAccumulator
+from src.pipeline.score_table import ScoreTable
+from src.pipeline.fast_path import RISK_LABELS
+from src.pipeline.batch_store import BatchStore, BatchNotFound, BatchNotReady, probability_histogram
+from src.pipeline.job_queue import JobQueue, JobWorker, JobNotFound
+from src.metrics import REGISTRY, stage
+from src.logger import dropped_records
 from api.schemas import CustomerInput
+from api.batching import MicroBatcher
+from api.executor import InferencePool, Overloaded
+from api.instrumentation import (
+    MetricsMiddleware, INFERENCE_PENDING, BATCHER_QUEUED, LOG_RECORDS_DROPPED
+)
+from api.serialization import (
+    ORIENTS, PREDICTION_COLUMNS, BINARY_MEDIA_TYPES,
+    dumps, prediction_payload, negotiate, request_media_type,
+    read_frame, write_predictions, binary_formats_available
+)
 
 app = FastAPI(
     title="Customer Churn Prediction API",
     description="ML-powered churn prediction service",
     version="1.0.0"
 )
+app.add_middleware(MetricsMiddleware)
 
 predict_pipeline = PredictPipeline()
+inference_pool = InferencePool()
+predict_batcher = MicroBatcher(predict_pipeline.predict_records, executor=inference_pool.executor)
+score_table = ScoreTable()
+batch_store = BatchStore()
+job_queue = JobQueue()
+job_workers = [
+    JobWorker(job_queue, predict_pipeline, batch_store, name=f"job-worker-{i}")
+    for i in range(job_queue.config.workers)
+]
+
+# every pool and job thread can be inside the model at once, so they split
+# the cores between them instead of each booster starting one per core
+if predict_pipeline.registry.config.model_threads <= 0:
+    predict_pipeline.registry.config.model_threads = max(
+        1, (os.cpu_count() or 1) // (inference_pool.config.workers + len(job_workers))
+    )
+
+
+@app.on_event("startup")
+async def load_model_artifacts():
+    # unpickle once at boot so the first request doesn't pay for it
+    await inference_pool.run(predict_pipeline.registry.load)
+    if predict_batcher.config.enabled:
+        predict_batcher.start()
+    for worker in job_workers:
+        worker.start()
+
+
+@app.on_event("shutdown")
+async def stop_batcher():
+    await predict_batcher.stop()
+    for worker in job_workers:
+        await asyncio.get_running_loop().run_in_executor(None, worker.stop, 10)
+    inference_pool.shutdown()
+
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"Service busy: {exc}"},
+        headers={"Retry-After": "1"}
+    )
+
+
+@app.exception_handler(BatchNotFound)
+async def batch_not_found_handler(request: Request, exc: BatchNotFound):
+    return JSONResponse(status_code=404, content={"detail": f"No batch {exc.args[0]}"})
+
+
+@app.exception_handler(JobNotFound)
+async def job_not_found_handler(request: Request, exc: JobNotFound):
+    return JSONResponse(status_code=404, content={"detail": f"No job {exc.args[0]}"})
+
+
+@app.exception_handler(BatchNotReady)
+async def batch_not_ready_handler(request: Request, exc: BatchNotReady):
+    return JSONResponse(status_code=409, content={"detail": str(exc)})
 
 
 @app.get("/health")
-def health_check():
-    return {"status": "OK", "message": "Churn model is ready"}
+async def health_check():
+    return {
+        "status": "OK",
+        "message": "Churn model is ready",
+        "model_version": predict_pipeline.registry.version
+    }
 
 
-@app.post("/predict")
-def predict_single_customer(customer: CustomerInput):
-    df = pd.DataFrame([customer.dict()])
+@app.get("/metrics")
+async def metrics():
+    INFERENCE_PENDING.set(inference_pool.pending)
+    BATCHER_QUEUED.set(predict_batcher.stats()["queued"])
+    LOG_RECORDS_DROPPED.set(dropped_records())
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
-    predictions = predict_pipeline.predict(df)
 
-    row = predictions.iloc[0]
+@app.post("/predict")
+async def predict_single_customer(customer: CustomerInput):
+    # coalesced with concurrent /predict calls into one vectorized batch
+    row = await _live_score(customer.dict())
+
     return {
         "customer_id": int(row["customer_id"]),
         "churn_probability": float(round(row["churn_probability"], 4)),
         "risk_level": str(row["risk_level"])
     }
 
+
+async def _live_score(record: dict):
+    if predict_batcher.config.enabled:
+        return await predict_batcher.submit(record)
+    return await inference_pool.run(predict_pipeline.predict_record, record)
+
+
+def _score_response(customer_id: int, churn_prob, risk_level, source: str):
+    return {
+        "customer_id": customer_id,
+        "churn_probability": float(round(churn_prob, 4)),
+        "risk_level": str(risk_level),
+        "source": source
+    }
+
+
+@app.get("/score/{customer_id}")
+async def score_lookup(customer_id: int):
+    # a primary-key read on a local SQLite file, cheap enough for the event loop
+    found = score_table.lookup(customer_id, predict_pipeline.registry.get().version)
+    if found is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No current precomputed score for customer {customer_id}; POST the customer to score it"
+        )
+    return _score_response(customer_id, *found, source="table")
+
+
+@app.post("/score/{customer_id}")
+async def score_or_predict(customer_id: int, customer: CustomerInput):
+    if customer.customer_id != customer_id:
+        raise HTTPException(status_code=400, detail="customer_id in path and body differ")
+
+    record = customer.dict()
+    found = score_table.lookup(customer_id, predict_pipeline.registry.get().version, record)
+    if found is not None:
+        return _score_response(customer_id, *found, source="table")
+
+    row = await _live_score(record)
+    return _score_response(customer_id, row["churn_probability"], row["risk_level"], source="live")
+
+
+@app.get("/score")
+async def score_table_stats():
+    return score_table.stats()
+
+
+@app.get("/predict/batching")
+async def predict_batching_stats():
+    return {**predict_batcher.stats(), "pool": inference_pool.stats()}
+
+
+@app.get("/predict/cache")
+async def predict_cache_stats():
+    if predict_pipeline.cache is None:
+        return {"enabled": False}
+    return predict_pipeline.cache.stats()
+
+
 @app.post("/predict_csv")
-def predict_csv(file: UploadFile = File(...)):
+async def predict_csv(file: UploadFile = File(...), orient: str = "records"):
     print("🔥 /predict_csv endpoint was HIT")
 
-    contents = file.file.read()
-    df = pd.read_csv(io.StringIO(contents.decode("utf-8")))
+    if orient not in ORIENTS:
+        raise HTTPException(status_code=400, detail="orient must be 'records' or 'columns'")
+
+    # admitted before the upload is read into memory, so refused requests cost nothing
+    async with inference_pool.admit():
+        contents = await file.read()
+        body = await inference_pool.run(_score_csv, contents, orient)
+    return Response(content=body, media_type="application/json")
+
+
+def _score_csv(contents: bytes, orient: str):
+    with stage("dataframe"):
+        df = pd.read_csv(io.StringIO(contents.decode("utf-8")))
+
+    predictions = predict_pipeline.predict(df)
+    kpis = _summary_kpis(predictions)
+
+    with stage("serialization"):
+        return dumps({
+            "kpis": kpis,
+            "predictions": prediction_payload(predictions, orient)
+        })
+
+
+def _summary_kpis(predictions):
+    with stage("kpi"):
+        results = ChurnKPI(predictions).compute_kpis()
+    return {
+        "total_customers": int(results["total_customers"]),
+        "high_risk_customers": int(results["high_risk_customers"]),
+        "medium_risk_customers": int(results["medium_risk_customers"]),
+        "low_risk_customers": int(results["low_risk_customers"]),
+        "average_churn_probability": float(results["average_churn_probability"])
+    }
+
+
+STREAM_COLUMNS = PREDICTION_COLUMNS
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+
+def _stream_predictions(upload, output_format: str, chunksize: int):
+    # one chunk of rows in memory at a time; KPIs are running totals (ndjson only)
+    reader = iter(pd.read_csv(upload, chunksize=chunksize))
+    kpi = ChurnKPIAccumulator()
+
+    try:
+        i = 0
+        while True:
+            with stage("dataframe"):
+                chunk = next(reader, None)
+            if chunk is None:
+                break
+            if chunk.empty:
+                # header-only upload: nothing to score, ndjson still gets its KPI line
+                continue
+
+            predictions = predict_pipeline.predict(chunk)
+            if output_format == "ndjson":
+                with stage("kpi"):
+                    kpi.update(predictions)
+            out = predictions[STREAM_COLUMNS]
+
+            with stage("serialization"):
+                if output_format == "csv":
+                    part = out.to_csv(index=False, header=(i == 0))
+                else:
+                    part = out.to_json(orient="records", lines=True)
+                    if part and not part.endswith("\n"):
+                        part += "\n"
+            yield part
+            i += 1
+
+        if output_format == "ndjson":
+            results = kpi.compute_kpis()
+            results.pop("top_risky_customers")
+            # orjson writes the NaN average of an empty upload as null
+            yield dumps({"kpis": results}) + b"\n"
+    finally:
+        upload.close()
 
+
+async def _admitted_stream(upload, output_format: str, chunksize: int):
+    # the admission slot is held until the last chunk has been sent
+    async with inference_pool.admit():
+        async for part in inference_pool.iterate(
+            _stream_predictions(upload, output_format, chunksize)
+        ):
+            yield part
+
+
+@app.post("/predict_csv/stream")
+async def predict_csv_stream(
+    file: UploadFile = File(...),
+    output_format: str = "ndjson",
+    chunksize: int = 50_000
+):
+    """
+    Score a CSV upload chunk by chunk and stream the rows back.
+
+    ndjson ends with a `{"kpis": ...}` line after the last row. csv is rows
+    only, with no KPI summary: a trailing record would break CSV readers, and
+    the status line and headers are sent before any row is scored. Use
+    ndjson, or a job (/jobs), when the summary is needed.
+    """
+    if output_format not in STREAM_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="output_format must be 'ndjson' or 'csv'")
+    if chunksize <= 0:
+        raise HTTPException(status_code=400, detail="chunksize must be positive")
+
+    # refuse up front so the client gets a 503 rather than a cut-off body
+    if inference_pool.pending >= inference_pool.config.max_pending:
+        raise Overloaded(f"{inference_pool.pending} bulk requests already in progress")
+
+    return StreamingResponse(
+        _admitted_stream(file.file, output_format, chunksize),
+        media_type=STREAM_MEDIA_TYPES[output_format]
+    )
+
+
+def _table_media_type(request: Request):
+    # body is the raw table: Arrow IPC, Parquet, CSV or JSON per Content-Type
+    request_type = request_media_type(request.headers.get("content-type"))
+    if request_type is None:
+        raise HTTPException(status_code=415, detail="Unsupported Content-Type for bulk scoring")
+    if request_type in BINARY_MEDIA_TYPES and not binary_formats_available():
+        raise HTTPException(status_code=415, detail="pyarrow is not installed on the server")
+    return request_type
+
+
+def _read_table(body: bytes, request_type: str):
+    try:
+        with stage("dataframe"):
+            return read_frame(body, request_type)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse {request_type} body: {e}")
+
+
+@app.post("/predict/bulk")
+async def predict_bulk(request: Request):
+    request_type = _table_media_type(request)
+    response_type = negotiate(
+        request.headers.get("accept"), default=request_type, allow_binary=binary_formats_available()
+    )
+    if response_type is None:
+        raise HTTPException(status_code=406, detail="No supported media type in Accept header")
+
+    async with inference_pool.admit():
+        body = await request.body()
+        content, kpis = await inference_pool.run(_score_bulk, body, request_type, response_type)
+
+    return Response(
+        content=content,
+        media_type=response_type,
+        headers={"X-Churn-KPIs": dumps(kpis).decode("utf-8"), "Vary": "Accept"}
+    )
+
+
+def _score_bulk(body: bytes, request_type: str, response_type: str):
+    df = _read_table(body, request_type)
     predictions = predict_pipeline.predict(df)
+    kpis = _summary_kpis(predictions)
+    with stage("serialization"):
+        return write_predictions(predictions, response_type, kpis), kpis
+
+
+
+# ===============================
+# Server-side batches: score once, then page, filter and export by batch id
+# ===============================
+@app.post("/batches", status_code=201)
+async def create_batch(request: Request):
+    # empty body opens a batch for chunk uploads; a table body is scored
+    # and sealed in one go
+    async with inference_pool.admit():
+        body = await request.body()
+        request_type = _table_media_type(request) if body else None
+        # create() prunes expired batches, which reads every meta.json
+        meta = await inference_pool.run(batch_store.create, predict_pipeline.registry.get().version)
+        if not body:
+            return meta
+        await inference_pool.run(_score_batch_chunk, meta["batch_id"], 0, body, request_type)
+        return await inference_pool.run(batch_store.seal, meta["batch_id"])
+
+
+@app.put("/batches/{batch_id}/chunks/{index}")
+async def upload_batch_chunk(batch_id: str, index: int, request: Request):
+    request_type = _table_media_type(request)
+
+    async with inference_pool.admit():
+        body = await request.body()
+        return await inference_pool.run(_score_batch_chunk, batch_id, index, body, request_type)
 
-    kpi = ChurnKPI(predictions)
-    results = kpi.compute_kpis()
 
+def _client_batch(batch_id: str) -> dict:
+    # a job's batch is written by its worker only; a stray chunk or seal
+    # would change what the job reports
+    meta = batch_store.get(batch_id)
+    if meta.get("job_id"):
+        raise HTTPException(status_code=409, detail=f"batch {batch_id} belongs to job {meta['job_id']}")
+    return meta
+
+
+def _score_batch_chunk(batch_id: str, index: int, body: bytes, request_type: str):
+    # fail before scoring when the batch is gone, sealed or job-owned
+    if _client_batch(batch_id)["status"] != "open":
+        raise BatchNotReady(f"batch {batch_id} is already sealed")
+    if index < 0:
+        raise HTTPException(status_code=400, detail="chunk index must not be negative")
+
+    df = _read_table(body, request_type)
+    predictions = predict_pipeline.predict(df)
+    batch_store.add_chunk(batch_id, index, predictions)
     return {
-        "kpis": {
-            "total_customers": int(results["total_customers"]),
-            "high_risk_customers": int(results["high_risk_customers"]),
-            "medium_risk_customers": int(results["medium_risk_customers"]),
-            "low_risk_customers": int(results["low_risk_customers"]),
-            "average_churn_probability": float(results["average_churn_probability"])
-        },
-        "predictions": [
-            {
-                "customer_id": int(row["customer_id"]),
-                "churn_probability": float(row["churn_probability"]),
-                "risk_level": str(row["risk_level"])
-            }
-            for _, row in predictions.iterrows()
-        ]
+        "batch_id": batch_id,
+        "index": index,
+        "rows": len(predictions),
+        "kpis": _summary_kpis(predictions),
+        "histogram": probability_histogram(
+            predictions["churn_probability"], batch_store.config.histogram_bins
+        )
+    }
+
+
+@app.post("/batches/{batch_id}/seal")
+async def seal_batch(batch_id: str):
+    # joins the chunks and builds the sort index
+    async with inference_pool.admit():
+        return await inference_pool.run(_seal_client_batch, batch_id)
+
+
+def _seal_client_batch(batch_id: str) -> dict:
+    _client_batch(batch_id)
+    return batch_store.seal(batch_id)
+
+
+@app.get("/batches")
+async def list_batches():
+    return {"batches": await inference_pool.run(batch_store.list)}
+
+
+@app.get("/batches/{batch_id}")
+async def get_batch(batch_id: str):
+    return batch_store.get(batch_id)
+
+
+@app.delete("/batches/{batch_id}")
+async def delete_batch(batch_id: str):
+    await inference_pool.run(batch_store.delete, batch_id)
+    return {"batch_id": batch_id, "deleted": True}
+
+
+async def _batch_page(batch_id: str, offset: int, limit: int, orient: str, **query):
+    if orient not in ORIENTS:
+        raise HTTPException(status_code=400, detail="orient must be 'records' or 'columns'")
+    try:
+        total, page = await inference_pool.run(
+            lambda: batch_store.query(batch_id, offset=offset, limit=limit, **query)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    with stage("serialization"):
+        body = dumps({
+            "batch_id": batch_id,
+            "total": total,
+            "offset": offset,
+            "limit": len(page),
+            "predictions": prediction_payload(page, orient)
+        })
+    return Response(content=body, media_type="application/json")
+
+
+@app.get("/batches/{batch_id}/predictions")
+async def batch_predictions(
+    batch_id: str,
+    offset: int = 0,
+    limit: int = 100,
+    sort: str = "churn_probability",
+    order: str = None,
+    risk_level: str = None,
+    min_probability: float = None,
+    max_probability: float = None,
+    orient: str = "records"
+):
+    if order not in (None, "asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+    return await _batch_page(
+        batch_id, offset, limit, orient,
+        sort=sort,
+        descending=None if order is None else order == "desc",
+        risk_level=risk_level,
+        min_probability=min_probability,
+        max_probability=max_probability
+    )
+
+
+@app.get("/batches/{batch_id}/top")
+async def batch_top(batch_id: str, k: int = 10, risk_level: str = None, orient: str = "records"):
+    # first page of the precomputed descending index
+    return await _batch_page(batch_id, 0, k, orient, risk_level=risk_level)
+
+
+@app.get("/batches/{batch_id}/export")
+async def export_batch(batch_id: str, risk_level: str = None):
+    # fail here rather than in the middle of the stream
+    if batch_store.get(batch_id)["status"] != "sealed":
+        raise BatchNotReady(f"batch {batch_id} is still open")
+    if risk_level is not None and risk_level not in RISK_LABELS:
+        raise HTTPException(status_code=400, detail=f"risk_level must be one of {', '.join(RISK_LABELS)}")
+
+    return StreamingResponse(
+        inference_pool.iterate(_export_csv(batch_id, risk_level)),
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="churn_{batch_id}.csv"'}
+    )
+
+
+def _export_csv(batch_id: str, risk_level: str):
+    for i, frame in enumerate(batch_store.iter_frames(batch_id, risk_level)):
+        yield frame.to_csv(index=False, header=(i == 0))
+
+
+# ===============================
+# Background jobs: the upload is stored and scored off the request
+# ===============================
+@app.post("/jobs", status_code=202)
+async def submit_job(request: Request):
+    # raw CSV body, or multipart with a `file` field like /predict_csv
+    content_type = request.headers.get("content-type", "")
+    multipart = content_type.startswith("multipart/form-data")
+    if not multipart and request_media_type(content_type) != "text/csv":
+        raise HTTPException(status_code=415, detail="Jobs take a CSV body or a multipart `file` upload")
+
+    job_id = job_queue.new_id()
+    path = job_queue.upload_path(job_id)
+    filename = None
+    try:
+        # written in pieces, the upload is never held in memory whole
+        with open(path, "wb") as out:
+            if multipart:
+                form = await request.form()
+                upload = form.get("file")
+                if upload is None or isinstance(upload, str):
+                    raise HTTPException(status_code=400, detail="multipart upload needs a `file` field")
+                filename = upload.filename
+                while piece := await upload.read(1024 * 1024):
+                    out.write(piece)
+            else:
+                async for piece in request.stream():
+                    out.write(piece)
+        job = job_queue.submit(job_id, filename)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+
+    return JSONResponse(
+        status_code=202,
+        content=_job_status(job),
+        headers={"Location": f"/jobs/{job_id}"}
+    )
+
+
+def _job_status(job: dict):
+    rows_total = job["rows_total"]
+    status = {
+        **job,
+        "progress": (
+            1.0 if job["status"] == "done"
+            else round(job["rows_done"] / rows_total, 4) if rows_total else 0.0
+        ),
+        "status_url": f"/jobs/{job['job_id']}",
+        "result": None,
+        "result_expired": False
     }
+    if job["status"] == "done":
+        try:
+            batch_store.get(job["batch_id"])
+        except BatchNotFound:
+            # pruned past BATCH_STORE_MAX_JOB_BATCHES or deleted
+            status["result_expired"] = True
+            return status
+        batch = f"/batches/{job['batch_id']}"
+        status["result"] = {
+            "batch_id": job["batch_id"],
+            "batch": batch,
+            "predictions": f"{batch}/predictions",
+            "export": f"{batch}/export"
+        }
+    return status
+
+
+@app.get("/jobs")
+async def list_jobs(limit: int = 50):
+    return {**job_queue.stats(), "jobs": [_job_status(job) for job in job_queue.list(limit)]}
+
 
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    # kpis are running totals while the job is in progress
+    return _job_status(job_queue.get(job_id))
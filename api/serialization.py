@@ -0,0 +1,145 @@
+import io
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+PREDICTION_COLUMNS = ["customer_id", "churn_probability", "risk_level"]
+ORIENTS = ("records", "columns")
+
+
+def prediction_columns(predictions):
+    # whole-column conversions instead of a Python dict per row
+    return {
+        "customer_id": predictions["customer_id"].astype("int64").tolist(),
+        "churn_probability": predictions["churn_probability"].astype("float64").tolist(),
+        "risk_level": predictions["risk_level"].astype(str).tolist()
+    }
+
+
+def prediction_payload(predictions, orient: str = "records"):
+    columns = prediction_columns(predictions)
+    if orient == "columns":
+        return columns
+    return [
+        {"customer_id": c, "churn_probability": p, "risk_level": r}
+        for c, p, r in zip(columns["customer_id"], columns["churn_probability"], columns["risk_level"])
+    ]
+
+
+def dumps(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+JSON = "application/json"
+CSV = "text/csv"
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+PARQUET = "application/vnd.apache.parquet"
+
+# request/response media types for the bulk endpoint, plus common aliases
+BULK_MEDIA_TYPES = {
+    JSON: JSON,
+    CSV: CSV,
+    ARROW_STREAM: ARROW_STREAM,
+    "application/vnd.apache.arrow.file": ARROW_STREAM,
+    PARQUET: PARQUET,
+    "application/x-parquet": PARQUET,
+}
+BINARY_MEDIA_TYPES = (ARROW_STREAM, PARQUET)
+
+
+def _media_type(header_value):
+    return header_value.split(";")[0].strip().lower()
+
+
+def negotiate(accept, default: str, allow_binary: bool = True):
+    """
+    Pick the response media type from an Accept header, honouring q-values.
+    Returns None when nothing acceptable is supported.
+    """
+    if not accept:
+        return default
+
+    ranked = []
+    for position, part in enumerate(accept.split(",")):
+        pieces = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in pieces[1:]:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            ranked.append((-q, position, pieces[0].lower()))
+
+    for _, _, media_type in sorted(ranked):
+        if media_type in ("*/*", "application/*"):
+            return default
+        if media_type in BULK_MEDIA_TYPES:
+            if not allow_binary and BULK_MEDIA_TYPES[media_type] in BINARY_MEDIA_TYPES:
+                continue
+            return BULK_MEDIA_TYPES[media_type]
+    return None
+
+
+def request_media_type(content_type):
+    return BULK_MEDIA_TYPES.get(_media_type(content_type or CSV))
+
+
+def read_frame(body: bytes, media_type: str):
+    import pandas as pd
+
+    if media_type == CSV:
+        return pd.read_csv(io.BytesIO(body))
+    if media_type == JSON:
+        return pd.DataFrame(json.loads(body))
+
+    import pyarrow as pa
+
+    if media_type == ARROW_STREAM:
+        reader = pa.ipc.open_stream(body) if not body.startswith(b"ARROW1") else pa.ipc.open_file(body)
+        return reader.read_pandas()
+
+    import pyarrow.parquet as pq
+    return pq.read_table(pa.BufferReader(body)).to_pandas()
+
+
+def write_predictions(predictions, media_type: str, kpis=None) -> bytes:
+    out = predictions[PREDICTION_COLUMNS]
+
+    if media_type == JSON:
+        return dumps({"kpis": kpis, "predictions": prediction_columns(out)})
+    if media_type == CSV:
+        return out.to_csv(index=False).encode("utf-8")
+
+    import pyarrow as pa
+
+    # risk_level stays a dictionary column: three strings, not one per row
+    table = pa.Table.from_pandas(out, preserve_index=False)
+    if kpis is not None:
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}), b"churn_kpis": dumps(kpis)
+        })
+
+    sink = pa.BufferOutputStream()
+    if media_type == ARROW_STREAM:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        import pyarrow.parquet as pq
+        pq.write_table(table, sink)
+    return sink.getvalue().to_pybytes()
+
+
+def binary_formats_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
@@ -0,0 +1,66 @@
+"""
+Cold-start cost of the pickled sklearn artifacts vs the native exports
+(XGBoost UBJSON / linear .npz + preprocessor.npz). Each run is a fresh
+interpreter, so import and load times are what a new replica pays.
+
+    python -m benchmarks.bench_cold_start --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+from src.pipeline.model_registry import ModelRegistry, ModelRegistryConfig
+imported = time.perf_counter()
+registry = ModelRegistry(ModelRegistryConfig(artifact_format=sys.argv[1]))
+registry.load()
+loaded = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - start,
+    "load_s": loaded - imported,
+    "sklearn_imported": "sklearn" in sys.modules,
+}))
+"""
+
+ARTIFACT_FILES = {
+    "pickle": ["model.pkl", "preprocessor.pkl"],
+    "native": ["model_native.json", "model.ubj", "model_linear.npz", "preprocessor.npz"],
+}
+
+
+def run_once(fmt):
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, fmt],
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'format':<8}{'import ms':>11}{'load ms':>10}{'disk KB':>10}  sklearn")
+    for fmt, files in ARTIFACT_FILES.items():
+        runs = [run_once(fmt) for _ in range(args.runs)]
+        size = sum(
+            os.path.getsize(os.path.join("artifacts", f))
+            for f in files if os.path.exists(os.path.join("artifacts", f))
+        )
+        print(
+            f"{fmt:<8}"
+            f"{statistics.median(r['import_s'] for r in runs) * 1000:>11.1f}"
+            f"{statistics.median(r['load_s'] for r in runs) * 1000:>10.1f}"
+            f"{size / 1024:>10.1f}  {runs[-1]['sklearn_imported']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
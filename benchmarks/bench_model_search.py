@@ -0,0 +1,47 @@
+"""
+Exhaustive grid search vs successive halving + early stopping, side by side
+on the same train/test split. Ingestion and transformation write into a
+temp directory, so the served artifacts/ are left alone.
+
+    python -m benchmarks.bench_model_search
+"""
+import os
+import tempfile
+
+from src.components.data_ingestion import DataIngestion
+from src.components.data_transformation import DataTransformation
+from src.components.transform_cache import TransformCache
+from src.components.model_trainer import ModelTrainer
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        ingestion = DataIngestion()
+        ingestion.ingestion_config.raw_data_path = os.path.join(tmp, "data.csv")
+        ingestion.ingestion_config.train_data_path = os.path.join(tmp, "train.csv")
+        ingestion.ingestion_config.test_data_path = os.path.join(tmp, "test.csv")
+        train_path, test_path = ingestion.initiate_data_ingestion()
+
+        transformation = DataTransformation()
+        transformation.data_transformation_config.preprocessor_obj_file_path = os.path.join(tmp, "preprocessor.pkl")
+        # the cache is built in __init__, so swap it rather than the config field
+        transformation.transform_cache = TransformCache(os.path.join(tmp, "transform_cache"))
+        data = transformation.start_data_transformation(train_path, test_path)
+
+        rows = ModelTrainer().compare_search_strategies(data)
+
+    print(f"{'strategy':<10}{'model':<20}{'ROC-AUC':>9}{'fit s':>9}")
+    for row in rows:
+        print(
+            f"{row['strategy']:<10}{row['model_name']:<20}"
+            f"{row['roc_auc']:>9.4f}{row['fit_seconds']:>9.2f}"
+        )
+
+    for strategy in ("grid", "halving"):
+        total = sum(r["fit_seconds"] for r in rows if r["strategy"] == strategy)
+        best = max(r["roc_auc"] for r in rows if r["strategy"] == strategy)
+        print(f"{strategy:<10}{'best / total':<20}{best:>9.4f}{total:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Single-customer latency: DataFrame + ColumnTransformer path vs the compiled
+NumPy fast path. Also checks that both produce identical probabilities.
+
+    python -m benchmarks.bench_predict_latency --iterations 2000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.pipeline.predict_pipeline import PredictPipeline
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000)
+
+
+def time_calls(fn, records, iterations):
+    samples = []
+    for i in range(iterations):
+        record = records[i % len(records)]
+        start = time.perf_counter()
+        fn(record)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default="Notebook/data/test.csv")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    # no cache: repeated records would otherwise time lookups, not scoring
+    pipeline = PredictPipeline(cache=None)
+    pipeline.registry.load()
+
+    records = pd.read_csv(args.data).to_dict(orient="records")
+
+    # correctness: every record must score identically on both paths, also
+    # with a missing category (sklearn imputes NaN but encodes None as unknown)
+    missing = [
+        {**records[0], "subscription_plan": None},
+        {**records[0], "subscription_plan": float("nan")},
+    ]
+    for record in records + missing:
+        slow = pipeline.predict(pd.DataFrame([record])).iloc[0]
+        fast = pipeline.predict_record(record)
+        assert slow["churn_probability"] == fast["churn_probability"], record
+        assert str(slow["risk_level"]) == str(fast["risk_level"]), record
+
+    def sklearn_path(record):
+        return pipeline.predict(pd.DataFrame([record])).iloc[0]
+
+    def fast_path(record):
+        return pipeline.predict_record(record)
+
+    # warm up both paths
+    time_calls(sklearn_path, records, 50)
+    time_calls(fast_path, records, 50)
+
+    print(f"{'path':<12}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, fn in (("sklearn", sklearn_path), ("fast", fast_path)):
+        samples = time_calls(fn, records, args.iterations)
+        print(f"{name:<12}{percentile_ms(samples, 50):>10.3f}{percentile_ms(samples, 99):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
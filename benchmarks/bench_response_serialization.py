@@ -0,0 +1,70 @@
+"""
+/predict_csv response building: the old iterrows() loop vs the column-array
+payloads in api/serialization.py, for both orient=records and orient=columns.
+Uses orjson when it is installed, the stdlib json module otherwise.
+
+    python -m benchmarks.bench_response_serialization --rows 100000
+"""
+import argparse
+import json
+import time
+
+import pandas as pd
+
+from api.serialization import dumps, orjson, prediction_payload
+from src.pipeline.predict_pipeline import PredictPipeline
+
+
+def iterrows_payload(predictions):
+    return [
+        {
+            "customer_id": int(row["customer_id"]),
+            "churn_probability": float(row["churn_probability"]),
+            "risk_level": str(row["risk_level"])
+        }
+        for _, row in predictions.iterrows()
+    ]
+
+
+def best_of(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        body = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default="Notebook/data/test.csv")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    pipeline = PredictPipeline()
+    pipeline.registry.load()
+
+    df = pd.read_csv(args.data)
+    df = df.sample(args.rows, replace=True, random_state=42).reset_index(drop=True)
+    df["customer_id"] = range(len(df))
+    predictions = pipeline.predict(df)
+
+    legacy = iterrows_payload(predictions)
+    assert prediction_payload(predictions, "records") == legacy
+
+    cases = {
+        "iterrows + json": lambda: json.dumps(iterrows_payload(predictions)).encode(),
+        "records": lambda: dumps(prediction_payload(predictions, "records")),
+        "columns": lambda: dumps(prediction_payload(predictions, "columns")),
+    }
+
+    print(f"{len(df)} rows, encoder: {'orjson' if orjson is not None else 'json'}")
+    print(f"{'payload':<18}{'ms':>10}{'MB':>8}")
+    for name, fn in cases.items():
+        seconds, size = best_of(fn, args.repeats)
+        print(f"{name:<18}{seconds * 1000:>10.1f}{size / 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+API cold start as a new replica sees it: import time of api.main, then
+time until the first /predict answer (startup hook + first request), each
+in a fresh interpreter. Also reports whether training-only packages were
+imported and whether importing created the log directory. The last row
+hides scikit-learn from the child, like the requirements-api.txt image
+(xgboost imports it eagerly when it is installed).
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+CHILD = r"""
+import json, os, sys, time
+if os.environ.get("BENCH_WITHOUT_SKLEARN") == "1":
+    # what the requirements-api.txt image looks like: scikit-learn not installed
+    sys.modules["sklearn"] = None
+start = time.perf_counter()
+import api.main
+imported = time.perf_counter()
+logs_on_import = os.path.exists(os.environ["LOG_DIR"])
+training_modules = sorted(m for m in ("sklearn", "scipy") if sys.modules.get(m) is not None)
+
+from fastapi.testclient import TestClient
+client_ready = time.perf_counter()
+with TestClient(api.main.app) as client:
+    response = client.post("/predict", json=json.loads(sys.argv[1]))
+    first_prediction = time.perf_counter()
+assert response.status_code == 200, response.text
+
+print(json.dumps({
+    "import_s": imported - start,
+    # TestClient's own import is not something a server pays
+    "first_prediction_s": first_prediction - client_ready,
+    "logs_on_import": logs_on_import,
+    "training_modules_on_import": training_modules,
+}))
+"""
+
+
+def run_once(fmt, record, without_sklearn=False):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            MODEL_ARTIFACT_FORMAT=fmt,
+            LOG_DIR=os.path.join(tmp, "logs"),
+            BENCH_WITHOUT_SKLEARN="1" if without_sklearn else "0"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", CHILD, json.dumps(record)],
+            capture_output=True, text=True, check=True, env=env
+        ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--data", default="Notebook/data/test.csv")
+    args = parser.parse_args()
+
+    import pandas as pd
+    record = pd.read_csv(args.data, nrows=1).drop(columns=["churn"], errors="ignore")
+    record = json.loads(record.to_json(orient="records"))[0]
+
+    print(f"{'setup':<16}{'import ms':>11}{'first pred ms':>15}{'total ms':>10}  logs on import  training imports")
+    for name, fmt, without_sklearn in (
+        ("pickle", "pickle", False),
+        ("native", "native", False),
+        ("native, no sk", "native", True),
+    ):
+        runs = [run_once(fmt, record, without_sklearn) for _ in range(args.runs)]
+        import_ms = statistics.median(r["import_s"] for r in runs) * 1000
+        first_ms = statistics.median(r["first_prediction_s"] for r in runs) * 1000
+        print(
+            f"{name:<16}{import_ms:>11.1f}{first_ms:>15.1f}{import_ms + first_ms:>10.1f}"
+            f"  {str(runs[-1]['logs_on_import']):<14}  {','.join(runs[-1]['training_modules_on_import']) or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
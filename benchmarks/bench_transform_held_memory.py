@@ -0,0 +1,130 @@
+"""
+Memory the transformation stage leaves held once the estimator has its
+training matrix: legacy np.c_ train/test arrays (plus the X/y slices the
+trainer cut from them) vs the TransformedData X/y bundle, on a synthetic
+dataset with the churn schema. Each variant runs in a fresh process and
+writes only inside the benchmark's temp directory.
+
+Peak RSS is printed for context but does not separate the two: it is set
+inside ColumnTransformer.fit_transform (SimpleImputer's median over the
+numeric block), before either layout is built.
+
+    python -m benchmarks.bench_transform_held_memory --rows 2000000
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+
+def make_dataset(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "customer_id": np.arange(n_rows),
+        "tenure_months": rng.integers(1, 72, n_rows),
+        "monthly_usage": rng.gamma(4.0, 25.0, n_rows),
+        "subscription_plan": rng.choice(["Basic", "Pro", "Enterprise"], n_rows),
+        "monthly_revenue": rng.choice([10, 20, 50], n_rows),
+        "support_tickets": rng.poisson(1.0, n_rows),
+        "last_login_days": rng.integers(0, 60, n_rows),
+        "payment_delay": rng.poisson(0.5, n_rows),
+        "churn": rng.binomial(1, 0.15, n_rows),
+    })
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def current_rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+
+
+def run_variant(variant, train_path, test_path, sparse_threshold, queue):
+    from sklearn.utils import check_array
+    from src.components.data_transformation import DataTransformation
+
+    baseline = current_rss_mb()
+    tracemalloc.start()
+
+    transformation = DataTransformation()
+    transformation.data_transformation_config.use_cache = False
+    transformation.data_transformation_config.sparse_threshold = sparse_threshold
+    # the fitted preprocessor and its native export go next to the temp
+    # CSVs, never over the served artifacts/
+    work_dir = os.path.dirname(train_path)
+    transformation.data_transformation_config.preprocessor_obj_file_path = os.path.join(work_dir, "preprocessor.pkl")
+
+    if variant == "legacy":
+        train_df = pd.read_csv(train_path)
+        test_df = pd.read_csv(test_path)
+        preprocessor = transformation.get_preprocessor(train_df)
+        X_train = preprocessor.fit_transform(train_df.drop(columns=["churn"]))
+        X_test = preprocessor.transform(test_df.drop(columns=["churn"]))
+        if hasattr(X_train, "toarray"):
+            # np.c_ can't take a sparse matrix, the old layout had to densify
+            X_train, X_test = X_train.toarray(), X_test.toarray()
+        train_arr = np.c_[X_train, np.array(train_df["churn"])]
+        test_arr = np.c_[X_test, np.array(test_df["churn"])]
+        # what ModelTrainer used to do
+        X_train, y_train = train_arr[:, :-1], train_arr[:, -1]
+        X_test, y_test = test_arr[:, :-1], test_arr[:, -1]
+        del train_df, test_df
+    else:
+        data = transformation.start_data_transformation(train_path, test_path)
+        X_train, y_train = data.X_train, data.y_train
+
+    # first thing every estimator does with the training matrix
+    X_fit = check_array(X_train, accept_sparse="csr", dtype=np.float64, order="C")
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    queue.put((
+        variant,
+        type(X_train).__name__,
+        current_rss_mb() - baseline,
+        peak_rss_mb() - baseline,
+        traced_peak / 2**20,
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--sparse-threshold", type=float, default=0.3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        df = make_dataset(args.rows)
+        split = int(len(df) * 0.8)
+        train_path = os.path.join(tmp, "train.csv")
+        test_path = os.path.join(tmp, "test.csv")
+        df.iloc[:split].to_csv(train_path, index=False)
+        df.iloc[split:].to_csv(test_path, index=False)
+        del df
+
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        # held: RSS still in use when the estimator gets its matrix;
+        # peak RSS: whole process; traced peak: Python + NumPy allocations only
+        print(f"{'variant':<10}{'X type':<14}{'held MB':>9}{'peak RSS MB':>13}{'traced peak MB':>16}")
+        for variant in ("legacy", "bundle"):
+            proc = ctx.Process(
+                target=run_variant,
+                args=(variant, train_path, test_path, args.sparse_threshold, queue)
+            )
+            proc.start()
+            name, x_type, held, peak, traced = queue.get()
+            proc.join()
+            print(f"{name:<10}{x_type:<14}{held:>9.0f}{peak:>13.0f}{traced:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,65 +1,163 @@
+import sys
+import heapq
+import numpy as np
 import pandas as pd
-from src.logger import logging
+from src.logger import logging, PER_REQUEST
 from src.exeption import CustomException
 
 
+RISK_LEVELS = ("High", "Medium", "Low")
+TOP_RISKY_CUSTOMERS = 10
+
 
 class ChurnKPI:
     def __init__(self, df: pd.DataFrame):
         try:
             if not isinstance(df, pd.DataFrame):
-                raise CustomException("Input must be a pandas DataFrame")
+                raise ValueError("Input must be a pandas DataFrame")
 
             if "churn_probability" not in df.columns:
-                raise CustomException("Missing churn_probability column")
+                raise ValueError("Missing churn_probability column")
 
             if "risk_level" not in df.columns:
-                raise CustomException("Missing risk_level column")
+                raise ValueError("Missing risk_level column")
 
-            self.df = df.copy()
-            logging.info("KPI module initialized successfully")
+            # read-only use, no need to copy the frame
+            self.df = df
+            logging.info("KPI module initialized successfully", extra=PER_REQUEST)
 
         except Exception as e:
-            raise CustomException(e)
+            raise CustomException(e, sys)
 
     def compute_kpis(self):
         try:
-            total_customers = len(self.df)
-
-            high_risk = (self.df["risk_level"] == "High").sum()
-            medium_risk = (self.df["risk_level"] == "Medium").sum()
-            low_risk = (self.df["risk_level"] == "Low").sum()
-
-            avg_churn_prob = round(self.df["churn_probability"].mean(), 4)
-            max_churn_prob = round(self.df["churn_probability"].max(), 4)
-
-            churn_distribution = (
-                self.df["risk_level"]
-                .value_counts(normalize=True)
-                .mul(100)
-                .round(2)
-                .to_dict()
-            )
-
-            top_risky_customers = (
-                self.df
-                .sort_values(by="churn_probability", ascending=False)
-                .head(10)
-            )
-
-            kpi_result = {
-                "total_customers": total_customers,
-                "high_risk_customers": high_risk,
-                "medium_risk_customers": medium_risk,
-                "low_risk_customers": low_risk,
-                "average_churn_probability": avg_churn_prob,
-                "maximum_churn_probability": max_churn_prob,
-                "risk_distribution_percent": churn_distribution,
-                "top_risky_customers": top_risky_customers
-            }
-
-            logging.info("KPI computation completed successfully")
+            kpi_result = ChurnKPIAccumulator().update(self.df).compute_kpis()
+
+            logging.info("KPI computation completed successfully", extra=PER_REQUEST)
             return kpi_result
 
         except Exception as e:
-            raise CustomException(e)
+            raise CustomException(e, sys)
+
+
+class ChurnKPIAccumulator:
+    """
+    Streaming, mergeable version of ChurnKPI.compute_kpis.
+
+    Predictions are fed in chunk by chunk; only counts, the probability
+    sum/max and a bounded top-k heap are kept. Accumulators built on
+    separate chunks or workers can be combined with merge().
+    """
+
+    def __init__(self, top_k: int = TOP_RISKY_CUSTOMERS):
+        self.top_k = top_k
+        self.total_customers = 0
+        self.risk_counts = dict.fromkeys(RISK_LEVELS, 0)
+        self.churn_probability_count = 0
+        self.churn_probability_sum = 0.0
+        self.maximum_churn_probability = None
+        self.columns = None
+        # min-heap of (churn_probability, -row_number, row values)
+        self._top = []
+
+    def update(self, predictions: pd.DataFrame):
+        try:
+            n_rows = len(predictions)
+            if n_rows == 0:
+                return self
+
+            if self.columns is None:
+                self.columns = list(predictions.columns)
+
+            for level, count in predictions["risk_level"].value_counts().items():
+                self.risk_counts[level] = self.risk_counts.get(level, 0) + int(count)
+
+            churn_prob = predictions["churn_probability"].to_numpy(dtype=np.float64)
+            valid = ~np.isnan(churn_prob)
+            if valid.any():
+                self.churn_probability_count += int(valid.sum())
+                self.churn_probability_sum += float(churn_prob[valid].sum())
+                chunk_max = float(churn_prob[valid].max())
+                if self.maximum_churn_probability is None or chunk_max > self.maximum_churn_probability:
+                    self.maximum_churn_probability = chunk_max
+
+            self._update_top(predictions, churn_prob, valid)
+            self.total_customers += n_rows
+            return self
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _update_top(self, predictions, churn_prob, valid):
+        if self.top_k <= 0:
+            return
+
+        candidates = np.flatnonzero(valid)
+        if len(candidates) > self.top_k:
+            # O(n) preselection so only k rows per chunk touch the heap
+            keep = np.argpartition(-churn_prob[candidates], self.top_k - 1)[:self.top_k]
+            candidates = candidates[keep]
+
+        rows = predictions.iloc[candidates][self.columns].itertuples(index=False, name=None)
+        for position, values in zip(candidates, rows):
+            self._push((churn_prob[position], -(self.total_customers + int(position)), values))
+
+    def _push(self, entry):
+        if len(self._top) < self.top_k:
+            heapq.heappush(self._top, entry)
+        elif entry[:2] > self._top[0][:2]:
+            heapq.heapreplace(self._top, entry)
+
+    def merge(self, other: "ChurnKPIAccumulator"):
+        # rows of `other` are treated as coming after the rows seen here
+        offset = self.total_customers
+        if self.columns is None:
+            self.columns = other.columns
+
+        for level, count in other.risk_counts.items():
+            self.risk_counts[level] = self.risk_counts.get(level, 0) + count
+
+        self.churn_probability_count += other.churn_probability_count
+        self.churn_probability_sum += other.churn_probability_sum
+        if other.maximum_churn_probability is not None and (
+            self.maximum_churn_probability is None
+            or other.maximum_churn_probability > self.maximum_churn_probability
+        ):
+            self.maximum_churn_probability = other.maximum_churn_probability
+
+        for churn_prob, neg_row, values in other._top:
+            self._push((churn_prob, neg_row - offset, values))
+
+        self.total_customers += other.total_customers
+        return self
+
+    def top_risky_customers(self) -> pd.DataFrame:
+        ordered = sorted(self._top, key=lambda entry: entry[:2], reverse=True)
+        return pd.DataFrame([values for _, _, values in ordered], columns=self.columns)
+
+    def compute_kpis(self):
+        average = (
+            self.churn_probability_sum / self.churn_probability_count
+            if self.churn_probability_count else float("nan")
+        )
+        maximum = (
+            self.maximum_churn_probability
+            if self.maximum_churn_probability is not None else float("nan")
+        )
+
+        bucketed = sum(self.risk_counts.values())
+        churn_distribution = {
+            level: round(count / bucketed * 100, 2)
+            for level, count in sorted(self.risk_counts.items(), key=lambda item: -item[1])
+        } if bucketed else {}
+
+        return {
+            "total_customers": self.total_customers,
+            "high_risk_customers": self.risk_counts["High"],
+            "medium_risk_customers": self.risk_counts["Medium"],
+            "low_risk_customers": self.risk_counts["Low"],
+            "average_churn_probability": round(average, 4),
+            "maximum_churn_probability": round(maximum, 4),
+            "risk_distribution_percent": churn_distribution,
+            "top_risky_customers": self.top_risky_customers()
+        }
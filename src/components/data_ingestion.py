@@ -4,13 +4,15 @@ import os
 
 from src.logger import logging
 from src.exeption import CustomException
+from src.utils import save_dataframe, artifact_path, resolve_artifact_format, DataFrameChunkWriter
 
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from dataclasses import dataclass
 
 from src.components.data_transformation import DataTransformation
-from src.components.model_trainer import ModelTrainer, ModelTrainerConfig
+from src.components.model_trainer import ModelTrainer
 
 
 
@@ -21,6 +23,14 @@ class DataIngestionConfig:
     test_data_path:str=os.path.join('artifacts',"test.csv")
     raw_data_path:str=os.path.join('artifacts',"data.csv")
     source_data_path:str=os.path.join('Notebook','data','customer_churn.csv')
+    # csv | parquet | feather, for the artifacts written by this stage
+    artifact_format:str=os.getenv('ARTIFACT_FORMAT','csv')
+    test_size:float=0.2
+    random_state:int=42
+    # out-of-core mode: read the source in chunks and split rows by hash
+    streaming:bool=os.getenv('INGESTION_STREAMING','0')=='1'
+    chunksize:int=int(os.getenv('INGESTION_CHUNKSIZE','500000'))
+    split_key_columns:tuple=('customer_id','churn')
 
 
 
@@ -29,8 +39,58 @@ class DataIngestion:
     def __init__(self):
         self.ingestion_config=DataIngestionConfig()
 
+    def hash_split_mask(self, df):
+        # True -> test. Keyed on customer_id and churn with a fixed siphash key, so a
+        # row always lands on the same side, on any machine, whatever the chunking.
+        # Each churn class is its own hash stream, which stratifies in expectation.
+        hash_key = f"{self.ingestion_config.random_state:016d}"[-16:]
+        hashes = pd.util.hash_pandas_object(
+            df[list(self.ingestion_config.split_key_columns)],
+            index=False,
+            hash_key=hash_key
+        ).to_numpy()
+        return hashes < np.uint64(self.ingestion_config.test_size * 2**64)
+
+    def initiate_streaming_data_ingestion(self):
+
+        logging.info("Streaming data ingestion starting")
+
+        try:
+            fmt = resolve_artifact_format(self.ingestion_config.artifact_format)
+            raw_writer = DataFrameChunkWriter(artifact_path(self.ingestion_config.raw_data_path, fmt))
+            train_writer = DataFrameChunkWriter(artifact_path(self.ingestion_config.train_data_path, fmt))
+            test_writer = DataFrameChunkWriter(artifact_path(self.ingestion_config.test_data_path, fmt))
+
+            reader = pd.read_csv(
+                self.ingestion_config.source_data_path,
+                chunksize=self.ingestion_config.chunksize
+            )
+
+            with raw_writer, train_writer, test_writer:
+                for chunk in reader:
+                    is_test = self.hash_split_mask(chunk)
+                    raw_writer.write(chunk)
+                    train_writer.write(chunk[~is_test])
+                    test_writer.write(chunk[is_test])
+
+            logging.info(
+                f"streaming ingestion completed: {train_writer.rows_written} train rows, "
+                f"{test_writer.rows_written} test rows ({fmt})"
+            )
+
+            return(
+                train_writer.file_path,
+                test_writer.file_path
+            )
+        except Exception as e:
+            logging.info("Exception occured in streaming data ingestion stage")
+            raise CustomException(e,sys)
+
     def initiate_data_ingestion(self):
 
+        if self.ingestion_config.streaming:
+            return self.initiate_streaming_data_ingestion()
+
         logging.info("Data ingestion starting")
 
         try:
@@ -39,20 +99,28 @@ class DataIngestion:
 
             logging.info("read data as dataframe")
 
-            os.makedirs(os.path.dirname(self.ingestion_config.train_data_path), exist_ok=True)
+            fmt = resolve_artifact_format(self.ingestion_config.artifact_format)
+            raw_data_path = artifact_path(self.ingestion_config.raw_data_path, fmt)
+            train_data_path = artifact_path(self.ingestion_config.train_data_path, fmt)
+            test_data_path = artifact_path(self.ingestion_config.test_data_path, fmt)
 
-            df.to_csv(self.ingestion_config.raw_data_path,index=False,header=True)
+            save_dataframe(df, raw_data_path)
             
-            logging.info("raw data saved")
+            logging.info(f"raw data saved as {fmt}")
 
-            train_set , test_set = train_test_split(df,test_size=0.2,random_state=42,stratify=df['churn'])
-            train_set.to_csv(self.ingestion_config.train_data_path,index=False,header=True)
-            test_set.to_csv(self.ingestion_config.test_data_path,index=False,header=True)
+            train_set , test_set = train_test_split(
+                df,
+                test_size=self.ingestion_config.test_size,
+                random_state=self.ingestion_config.random_state,
+                stratify=df['churn']
+            )
+            save_dataframe(train_set, train_data_path)
+            save_dataframe(test_set, test_data_path)
             logging.info("ingestion of data is completed")
 
             return(
-                self.ingestion_config.train_data_path,
-                self.ingestion_config.test_data_path
+                train_data_path,
+                test_data_path
             )
         except Exception as e:
             logging.info("Exception occured in data ingestion stage")
@@ -65,7 +133,7 @@ if __name__=="__main__":
     train_data,test_data = obj.initiate_data_ingestion()
 
     data_transf=DataTransformation()
-    train_array,test_array,_=data_transf.start_data_transformation(train_data,test_data)
+    transformed_data=data_transf.start_data_transformation(train_data,test_data)
 
     ModelTrainer_obj=ModelTrainer()
-    print(ModelTrainer_obj.initiate_model_trainer(train_array,test_array))
\ No newline at end of file
+    print(ModelTrainer_obj.initiate_model_trainer(transformed_data))
\ No newline at end of file
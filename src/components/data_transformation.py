@@ -3,9 +3,10 @@ import os
 
 from src.logger import logging
 from src.exeption import CustomException
-from src.utils import save_object
+from src.utils import save_object, load_dataframe
+from src.components.transform_cache import TransformCache
+from src.pipeline.native_model import export_native_preprocessor
 
-import pandas as pd
 import numpy as np 
 
 from sklearn.preprocessing import StandardScaler,OneHotEncoder
@@ -23,10 +24,31 @@ from dataclasses import dataclass
 class DataTransformationConfig:
     target_column='churn'
     preprocessor_obj_file_path:str=os.path.join('artifacts','preprocessor.pkl')
+    # reuse fitted preprocessor + transformed arrays when inputs are unchanged
+    use_cache:bool=os.getenv('TRANSFORM_CACHE','1')=='1'
+    cache_dir:str=os.path.join('artifacts','transform_cache')
+    # entries kept, least recently used evicted first
+    cache_max_entries:int=int(os.getenv('TRANSFORM_CACHE_MAX_ENTRIES','4'))
+    # ColumnTransformer returns scipy.sparse when output density is below this
+    sparse_threshold:float=0.3
+
+
+@dataclass
+class TransformedData:
+    # X_* are ndarrays, or CSR matrices when the one-hot output stays sparse
+    X_train:object
+    y_train:np.ndarray
+    X_test:object
+    y_test:np.ndarray
+    preprocessor_path:str
 
 class DataTransformation:
     def __init__(self):
         self.data_transformation_config=DataTransformationConfig()
+        self.transform_cache=TransformCache(
+            self.data_transformation_config.cache_dir,
+            self.data_transformation_config.cache_max_entries
+        )
 
     def get_preprocessor(self,df):
 
@@ -35,31 +57,12 @@ class DataTransformation:
             logging.info("data transformation started")
 
             target_col=self.data_transformation_config.target_column
-            X = df.drop(columns=[target_col],axis=1)
+            X = df.drop(columns=[target_col])
 
             num_cols = X.select_dtypes(include=['int64','float64']).columns
-            cat_cols = X.select_dtypes(include=['object']).columns
+            cat_cols = X.select_dtypes(include=['object','category']).columns
 
-            num_pipe= Pipeline(
-                steps=[
-                    ('imputer',SimpleImputer(strategy='median')),
-                    ('scaler',StandardScaler())
-                ]
-            )
-
-            cat_pipe = Pipeline(
-                steps=[
-                    ('imputer',SimpleImputer(strategy='most_frequent')),
-                    ('one_hot_encoder',OneHotEncoder(handle_unknown='ignore')),
-                    
-                ]
-            )
-            preprocessor = ColumnTransformer(
-                [
-                    ('num_pipe',num_pipe,num_cols),
-                    ('cat_pipe',cat_pipe,cat_cols)
-                ]
-            )
+            preprocessor = self.build_preprocessor(num_cols,cat_cols)
             logging.info("preprocessor object created")
 
             return preprocessor
@@ -67,13 +70,70 @@ class DataTransformation:
         except Exception as e:
             logging.info("Exception occured in data transformation stage")
             raise CustomException(e,sys)
+
+    def build_preprocessor(self,num_cols,cat_cols):
+        num_pipe= Pipeline(
+            steps=[
+                ('imputer',SimpleImputer(strategy='median')),
+                ('scaler',StandardScaler())
+            ]
+        )
+
+        cat_pipe = Pipeline(
+            steps=[
+                ('imputer',SimpleImputer(strategy='most_frequent')),
+                ('one_hot_encoder',OneHotEncoder(handle_unknown='ignore')),
+                
+            ]
+        )
+
+        return ColumnTransformer(
+            [
+                ('num_pipe',num_pipe,num_cols),
+                ('cat_pipe',cat_pipe,cat_cols)
+            ],
+            sparse_threshold=self.data_transformation_config.sparse_threshold
+        )
+
+    def preprocessor_config(self):
+        # every step's params; columns come from the data, which the cache key hashes anyway
+        preprocessor=self.build_preprocessor([],[])
+        parts=["layout=xy-bundle",
+               f"target={self.data_transformation_config.target_column}",
+               f"column_transformer={sorted((k,v) for k,v in preprocessor.get_params(deep=False).items() if k!='transformers')!r}"]
+        for name,pipe,_ in preprocessor.transformers:
+            for step_name,step in pipe.steps:
+                parts.append(f"{name}.{step_name}={type(step).__name__}{sorted(step.get_params().items())!r}")
+        return "\n".join(parts)
         
+    def save_preprocessor(self,preprocessor_obj):
+        preprocessor_path=self.data_transformation_config.preprocessor_obj_file_path
+        save_object(file_path=preprocessor_path,obj=preprocessor_obj)
+        # plain-array copy that the serving side loads without sklearn or pickle
+        export_native_preprocessor(preprocessor_obj,os.path.dirname(preprocessor_path))
+
     def start_data_transformation(self,train_path,test_path):
         try:
             logging.info("starting")
 
-            train_df=pd.read_csv(train_path)
-            test_df=pd.read_csv(test_path)
+            cache_key=None
+            if self.data_transformation_config.use_cache:
+                cache_key=self.transform_cache.make_key(
+                    [train_path,test_path],self.preprocessor_config()
+                )
+                cached=self.transform_cache.load(cache_key)
+                if cached is not None:
+                    preprocessor_obj,arrays=cached
+                    self.save_preprocessor(preprocessor_obj)
+                    logging.info("transform skipped, reused cached preprocessor and arrays")
+                    return TransformedData(
+                        preprocessor_path=self.data_transformation_config.preprocessor_obj_file_path,
+                        **arrays
+                    )
+
+            # csv, parquet or feather depending on what ingestion wrote
+            train_df=load_dataframe(train_path)
+            test_df=load_dataframe(test_path)
 
             logging.info("reading completed")
 
@@ -81,29 +141,32 @@ class DataTransformation:
 
             target_col=self.data_transformation_config.target_column
 
-            input_feature_train_df = train_df.drop(columns=[target_col],axis=1)
-            target_feature_train_df = train_df[target_col]
-
-            input_feature_test_df = test_df.drop(columns=[target_col],axis=1)
-            target_feature_test_df = test_df[target_col]
+            input_feature_train_df = train_df.drop(columns=[target_col])
+            input_feature_test_df = test_df.drop(columns=[target_col])
 
             logging.info("preprocessing")
 
-            input_train_arr = preprocessor_obj.fit_transform(input_feature_train_df)
-            input_test_arr = preprocessor_obj.transform(input_feature_test_df)
-            
-            train_arr = np.c_[input_train_arr, np.array(target_feature_train_df)]
-            test_arr = np.c_[input_test_arr, np.array(target_feature_test_df)]
+            # X and y stay separate: no np.c_ copy and the label keeps its int dtype
+            data = TransformedData(
+                X_train=preprocessor_obj.fit_transform(input_feature_train_df),
+                y_train=train_df[target_col].to_numpy(),
+                X_test=preprocessor_obj.transform(input_feature_test_df),
+                y_test=test_df[target_col].to_numpy(),
+                preprocessor_path=self.data_transformation_config.preprocessor_obj_file_path
+            )
 
             logging.info("preprocessing completed") 
 
-            save_object(
-                file_path=self.data_transformation_config.preprocessor_obj_file_path,
-                obj=preprocessor_obj
-            )
+            self.save_preprocessor(preprocessor_obj)
 
             logging.info("preprocessor saved as pkl file")
-            return(train_arr,test_arr,self.data_transformation_config.preprocessor_obj_file_path)
+
+            if cache_key is not None:
+                self.transform_cache.store(
+                    cache_key,preprocessor_obj,
+                    {"X_train":data.X_train,"y_train":data.y_train,"X_test":data.X_test,"y_test":data.y_test}
+                )
+            return data
         
 
         except Exception as e:
@@ -1,11 +1,18 @@
 import sys
 import os
+import time
 from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+
+from joblib import parallel_backend
 
 import numpy as np
+from sklearn.base import clone
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import roc_auc_score
-from sklearn.model_selection import GridSearchCV
+from sklearn.model_selection import GridSearchCV, ParameterGrid, train_test_split
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV
 
 import xgboost as xgb
 
@@ -13,98 +20,261 @@ from src.logger import logging
 from src.exeption import CustomException
 
 from src.utils import save_object
+from src.components.data_transformation import TransformedData
+from src.pipeline.native_model import export_native_model
+from src.pipeline.model_registry import write_artifact_manifest
+
+
+SEARCH_STRATEGIES = ("grid", "halving")
 
 
 @dataclass
 class ModelTrainerConfig:
     trained_model_file_path: str = os.path.join("artifacts", "model.pkl")
+    # grid: exhaustive GridSearchCV | halving: successive halving + early stopping
+    search_strategy: str = os.getenv("MODEL_SEARCH", "grid")
+    cv: int = 3
+    halving_factor: int = 3
+    # held out of the training set for XGBoost early stopping (halving only)
+    validation_size: float = 0.15
+    early_stopping_rounds: int = 20
+    random_state: int = 42
+    # cores shared by all candidate searches, which run at the same time
+    n_jobs: int = int(os.getenv("TRAIN_N_JOBS", os.cpu_count() or 1))
 
 
 class ModelTrainer:
     def __init__(self):
         self.model_trainer_config = ModelTrainerConfig()
 
-    def initiate_model_trainer(self, train_array: np.ndarray, test_array: np.ndarray):
-        try:
-            logging.info("Starting model training process")
+    def get_candidates(self, y_train):
+        num_negative = np.sum(y_train == 0)
+        num_positive = np.sum(y_train == 1)
+
+        scale_pos_weight = num_negative / num_positive
+
+        models = {
+            "LogisticRegression": LogisticRegression(max_iter=1000),
+            "XGBoost": xgb.XGBClassifier(
+                eval_metric="auc",
+                scale_pos_weight=scale_pos_weight,
+                n_estimators=100,
+                random_state=self.model_trainer_config.random_state
+            )
+        }
+
+        params = {
+            "LogisticRegression": {
+                "C": [0.01, 0.1, 1, 10]
+            },
+            "XGBoost": {
+                "n_estimators": [100, 200],
+                "max_depth": [3, 5],
+                "learning_rate": [0.05, 0.1],
+                "subsample": [0.8],
+                "colsample_bytree": [0.8]
+            }
+        }
 
-            
-            X_train, y_train = train_array[:, :-1], train_array[:, -1]
-            X_test, y_test = test_array[:, :-1], test_array[:, -1]
+        return {name: (model, params[name]) for name, model in models.items()}
 
+    def _halving_setup(self, model, param_grid, X_val, y_val):
+        # boosting rounds are budgeted by early stopping instead of the grid:
+        # the largest n_estimators becomes the cap and the validation fold picks the rest
+        fit_params = {}
+        if isinstance(model, xgb.XGBClassifier):
+            param_grid = dict(param_grid)
+            n_estimators = param_grid.pop("n_estimators", [model.n_estimators])
+            model = model.set_params(
+                n_estimators=max(n_estimators),
+                early_stopping_rounds=self.model_trainer_config.early_stopping_rounds
+            )
+            fit_params = {"eval_set": [(X_val, y_val)], "verbose": False}
+        return model, param_grid, fit_params
+
+    def _uses_threads(self, model):
+        # lbfgs LogisticRegression is single threaded, extra cores only help as more folds
+        return "n_jobs" in model.get_params() and not isinstance(model, LogisticRegression)
+
+    def allocate_cores(self, candidates):
+        # cores per candidate in proportion to its number of CV fits, at least one each
+        total_cores = max(1, self.model_trainer_config.n_jobs)
+        n_fits = {
+            name: len(ParameterGrid(param_grid)) * self.model_trainer_config.cv
+            for name, (_, param_grid) in candidates.items()
+        }
+        total_fits = sum(n_fits.values())
+        allocation = {
+            name: max(1, int(total_cores * fits / total_fits))
+            for name, fits in n_fits.items()
+        }
+
+        # single-threaded estimators can't use more cores than they have fits
+        for name, (model, _) in candidates.items():
+            if not self._uses_threads(model):
+                allocation[name] = min(allocation[name], n_fits[name])
+
+        # hand out cores left over from rounding and capping, biggest searches first
+        spare = total_cores - sum(allocation.values())
+        growable = [name for name, (model, _) in candidates.items() if self._uses_threads(model)]
+        for name in sorted(growable, key=n_fits.get, reverse=True) * max(0, spare):
+            if spare <= 0:
+                break
+            allocation[name] += 1
+            spare -= 1
+
+        # split each share between CV-fold workers and the estimator's own threads
+        plan = {}
+        for name, cores in allocation.items():
+            search_jobs = min(cores, n_fits[name])
+            estimator_threads = max(1, cores // search_jobs) if self._uses_threads(candidates[name][0]) else 1
+            plan[name] = (search_jobs, estimator_threads)
+        return plan
+
+    def search_candidate(self, model_name, model, param_grid, X_train, y_train, strategy, X_val=None, y_val=None, n_jobs=-1):
+        logging.info(f"Training {model_name} ({strategy} search, {n_jobs} jobs)")
+
+        if strategy == "halving":
+            model, param_grid, fit_params = self._halving_setup(model, param_grid, X_val, y_val)
+            # rows are the halving budget: every config starts on a small sample and
+            # only the best 1/factor move on to factor x more rows
+            grid = HalvingGridSearchCV(
+                estimator=model,
+                param_grid=param_grid,
+                scoring="roc_auc",
+                cv=self.model_trainer_config.cv,
+                factor=self.model_trainer_config.halving_factor,
+                resource="n_samples",
+                random_state=self.model_trainer_config.random_state,
+                n_jobs=n_jobs,
+                verbose=0
+            )
+        else:
+            fit_params = {}
+            grid = GridSearchCV(
+                estimator=model,
+                param_grid=param_grid,
+                scoring="roc_auc",
+                cv=self.model_trainer_config.cv,
+                n_jobs=n_jobs,
+                verbose=0
+            )
 
-            num_negative = np.sum(y_train == 0)
-            num_positive = np.sum(y_train == 1)
+        grid.fit(X_train, y_train, **fit_params)
+        return grid.best_estimator_, grid.best_params_
 
-            scale_pos_weight = num_negative / num_positive
-           
-            models = {
-                "LogisticRegression": LogisticRegression(max_iter=1000),
-                "XGBoost": xgb.XGBClassifier(
-                    eval_metric="auc",
-                    scale_pos_weight=scale_pos_weight,
-                    n_estimators=100,
-                    random_state=42
+    def refit_full(self, model, X_train, y_train):
+        # early stopping found the round count; retrain on train + validation rows
+        best_iteration = getattr(model, "best_iteration", None)
+        if not isinstance(model, xgb.XGBClassifier) or best_iteration is None:
+            return model
+        final = clone(model).set_params(n_estimators=best_iteration + 1, early_stopping_rounds=None)
+        return final.fit(X_train, y_train)
+
+    def run_search(self, data: TransformedData, strategy: str):
+        if strategy not in SEARCH_STRATEGIES:
+            raise ValueError(f"Unknown search strategy: {strategy}")
+
+        X_train, y_train = data.X_train, data.y_train
+        X_test, y_test = data.X_test, data.y_test
+
+        X_fit, y_fit = X_train, y_train
+        X_val = y_val = None
+        if strategy == "halving":
+            X_fit, X_val, y_fit, y_val = train_test_split(
+                X_train,
+                y_train,
+                test_size=self.model_trainer_config.validation_size,
+                random_state=self.model_trainer_config.random_state,
+                stratify=y_train
+            )
+
+        candidates = self.get_candidates(y_train)
+        plan = self.allocate_cores(candidates)
+
+        def train_candidate(model_name):
+            model, param_grid = candidates[model_name]
+            search_jobs, estimator_threads = plan[model_name]
+            model_n_jobs = model.get_params().get("n_jobs")
+            if "n_jobs" in model.get_params():
+                model = model.set_params(n_jobs=estimator_threads)
+
+            start = time.perf_counter()
+            # thread-local backend: folds of this search run as threads inside our share
+            # of the cores; XGBoost and BLAS release the GIL, and nothing is copied
+            with parallel_backend("threading", n_jobs=search_jobs):
+                trained_model, best_params = self.search_candidate(
+                    model_name, model, param_grid, X_fit, y_fit, strategy, X_val, y_val,
+                    n_jobs=search_jobs
                 )
-            }
+                if strategy == "halving":
+                    trained_model = self.refit_full(trained_model, X_train, y_train)
+            fit_seconds = time.perf_counter() - start
+
+            if "n_jobs" in trained_model.get_params():
+                # don't ship the training thread budget to the serving side
+                trained_model.set_params(n_jobs=model_n_jobs)
+
+            y_prob = trained_model.predict_proba(X_test)[:, 1]
+            roc_auc = roc_auc_score(y_test, y_prob)
 
-            params = {
-                "LogisticRegression": {
-                    "C": [0.01, 0.1, 1, 10]
-                },
-                "XGBoost": {
-                    "n_estimators": [100, 200],
-                    "max_depth": [3, 5],
-                    "learning_rate": [0.05, 0.1],
-                    "subsample": [0.8],
-                    "colsample_bytree": [0.8]
-                }
+            logging.info(
+                f"{model_name} ROC-AUC: {roc_auc} | {fit_seconds:.1f}s on "
+                f"{search_jobs}x{estimator_threads} threads | Best Params: {best_params}"
+            )
+            return {
+                "model_name": model_name,
+                "model": trained_model,
+                "best_params": best_params,
+                "roc_auc": roc_auc,
+                "fit_seconds": fit_seconds,
+                "search_jobs": search_jobs,
+                "estimator_threads": estimator_threads
             }
 
-            best_model = None
-            best_score = 0.0
-            best_model_name = None
-
-           
-            
-            for model_name, model in models.items():
-                logging.info(f"Training {model_name}")
-
-                grid = GridSearchCV(
-                    estimator=model,
-                    param_grid=params[model_name],
-                    scoring="roc_auc",
-                    cv=3,
-                    
-                    n_jobs=-1,
-                    verbose=0
-                )
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(candidates)) as pool:
+            futures = [pool.submit(train_candidate, name) for name in candidates]
+            results = [future.result() for future in futures]
 
-                grid.fit(X_train, y_train)
+        logging.info(
+            f"{len(results)} candidate searches finished in {time.perf_counter() - start:.1f}s wall, "
+            + ", ".join(f"{r['model_name']}={r['fit_seconds']:.1f}s" for r in results)
+        )
+        return results
 
-                trained_model = grid.best_estimator_
+    def compare_search_strategies(self, data: TransformedData):
+        # same data, both strategies, for a side-by-side of ROC-AUC and training time
+        rows = []
+        for strategy in SEARCH_STRATEGIES:
+            for result in self.run_search(data, strategy):
+                rows.append({
+                    "strategy": strategy,
+                    "model_name": result["model_name"],
+                    "roc_auc": result["roc_auc"],
+                    "fit_seconds": result["fit_seconds"]
+                })
+        return rows
 
-                y_prob = trained_model.predict_proba(X_test)[:, 1]
-                roc_auc = roc_auc_score(y_test, y_prob)
+    def initiate_model_trainer(self, data: TransformedData):
+        try:
+            logging.info("Starting model training process")
 
-                logging.info(
-                    f"{model_name} ROC-AUC: {roc_auc} | Best Params: {grid.best_params_}"
-                )
+            results = self.run_search(data, self.model_trainer_config.search_strategy)
 
-                if roc_auc > best_score:
-                    best_score = roc_auc
-                    best_model = trained_model
-                    best_model_name = model_name
+            best = max(results, key=lambda result: result["roc_auc"])
+            best_model = best["model"]
+            best_score = best["roc_auc"]
+            best_model_name = best["model_name"]
 
-           
             if best_score < 0.60:
-                raise CustomException("No suitable model found with ROC-AUC >= 0.60")
+                raise ValueError("No suitable model found with ROC-AUC >= 0.60")
 
             logging.info(
                 f"Best model selected: {best_model_name} with ROC-AUC: {best_score}"
             )
 
-           
+
             save_object(
                 file_path=self.model_trainer_config.trained_model_file_path,
                 obj=best_model
@@ -112,7 +282,14 @@ class ModelTrainer:
 
             logging.info("Best model saved successfully")
 
+            # fast-loading copy for the serving side (MODEL_ARTIFACT_FORMAT=native)
+            artifact_dir = os.path.dirname(self.model_trainer_config.trained_model_file_path)
+            export_native_model(best_model, artifact_dir)
+
+            # last: serving reloads on this, once the whole set is in place
+            write_artifact_manifest(artifact_dir)
+
             return best_model_name, best_score
 
         except Exception as e:
-            raise CustomException(e, sys)
\ No newline at end of file
+            raise CustomException(e, sys)
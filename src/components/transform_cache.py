@@ -0,0 +1,126 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import tempfile
+
+import numpy as np
+import scipy.sparse
+import sklearn
+
+from src.logger import logging
+from src.exeption import CustomException
+from src.utils import save_object, load_object, file_digest
+
+
+class TransformCache:
+    """
+    Content-addressed store for fitted preprocessors and their output.
+
+    An entry lives in <cache_dir>/<key>/ where key hashes the train/test
+    artifact bytes and the (unfitted) preprocessor configuration, so any
+    change to either makes a new entry instead of reusing a stale one.
+    Only the max_entries most recently used entries are kept.
+    """
+
+    PREPROCESSOR_FILE = "preprocessor.pkl"
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self, cache_dir, max_entries=4):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    def make_key(self, data_paths, preprocessor_config):
+        digest = hashlib.sha256()
+        for path in data_paths:
+            digest.update(file_digest(path).encode())
+        digest.update(preprocessor_config.encode())
+        digest.update(sklearn.__version__.encode())
+        return digest.hexdigest()[:32]
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key):
+        entry_dir = self._entry_dir(key)
+        manifest_path = os.path.join(entry_dir, self.MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return None
+
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+
+            arrays = {}
+            for name, file_name in manifest["arrays"].items():
+                path = os.path.join(entry_dir, file_name)
+                if file_name.endswith(".npz"):
+                    arrays[name] = scipy.sparse.load_npz(path).tocsr()
+                else:
+                    # memory-mapped: nothing is read until the trainer touches it
+                    arrays[name] = np.load(path, mmap_mode="r")
+            preprocessor = load_object(os.path.join(entry_dir, self.PREPROCESSOR_FILE))
+            try:
+                # last use, for eviction
+                os.utime(entry_dir)
+            except OSError:
+                pass
+
+            logging.info(f"transform cache hit {key}")
+            return preprocessor, arrays
+
+        except Exception as e:
+            logging.warning(f"ignoring unreadable transform cache entry {key}: {e}")
+            return None
+
+    def store(self, key, preprocessor, arrays):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            staging_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix=".staging-")
+
+            manifest = {"arrays": {}}
+            for name, array in arrays.items():
+                if scipy.sparse.issparse(array):
+                    file_name = f"{name}.npz"
+                    scipy.sparse.save_npz(os.path.join(staging_dir, file_name), array)
+                else:
+                    file_name = f"{name}.npy"
+                    np.save(os.path.join(staging_dir, file_name), array)
+                manifest["arrays"][name] = file_name
+
+            save_object(os.path.join(staging_dir, self.PREPROCESSOR_FILE), preprocessor)
+            with open(os.path.join(staging_dir, self.MANIFEST_FILE), "w") as f:
+                json.dump(manifest, f)
+            # mkdtemp makes it 0700; other users and container UIDs read the cache too
+            os.chmod(staging_dir, 0o755)
+
+            # publish the whole entry at once so readers never see half of it
+            entry_dir = self._entry_dir(key)
+            try:
+                os.rename(staging_dir, entry_dir)
+            except OSError:
+                # another run stored the same key first
+                shutil.rmtree(staging_dir, ignore_errors=True)
+
+            logging.info(f"transform cache stored {key}")
+            self._evict()
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            # staging directories belong to runs still writing them
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            try:
+                entries.append((os.stat(path).st_mtime, path))
+            except FileNotFoundError:
+                continue
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_entries:]:
+            logging.info(f"evicting transform cache entry {os.path.basename(path)}")
+            shutil.rmtree(path, ignore_errors=True)
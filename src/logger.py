@@ -1,15 +1,185 @@
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import copy
+import json
+import queue
+import atexit
+import random
+import threading
+from datetime import datetime, timezone
 
-LOG_FILE = f"{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.log"
-logs_path = os.path.join(os.getcwd(), "logs")
-os.makedirs(logs_path, exist_ok=True)
+LOG_DIR = os.getenv("LOG_DIR", os.path.join(os.getcwd(), "logs"))
+# each process writes churn-<pid>.log: rotation is not safe across processes
+LOG_FILE = os.getenv("LOG_FILE", "churn.log")
 
-LOG_FILE_PATH = os.path.join(logs_path, LOG_FILE)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# json | text
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(20 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+# share of per-request INFO records kept; warnings and errors are never sampled
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+# records waiting for the writer thread; past this they are dropped, not waited on
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
 
-logging.basicConfig(
-    filename=LOG_FILE_PATH,
-    format='[%(asctime)s] %(lineno)d %(levelname)s - %(message)s',
-    level=logging.INFO,
-)
\ No newline at end of file
+TEXT_FORMAT = '[%(asctime)s] %(lineno)d %(levelname)s - %(message)s'
+
+# logging.info("...", extra=PER_REQUEST) marks a hot-path record for sampling
+PER_REQUEST = {"per_request": True}
+
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "module": record.module,
+            "line": record.lineno,
+            "process": record.process,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        # anything passed via extra= becomes a top-level field
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key not in payload:
+                payload[key] = value
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno > logging.INFO or not getattr(record, "per_request", False):
+            return True
+        return self.rate >= 1.0 or random.random() < self.rate
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks the caller: when the writer thread falls
+    behind and the queue is full, the record is counted and dropped.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record):
+        # render args and traceback now, the writer thread may see the record later
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+_listener = None
+_queue_handler = None
+_lock = threading.Lock()
+
+
+def log_file_path():
+    # uvicorn workers and batch scoring workers each rotate their own file
+    root, ext = os.path.splitext(LOG_FILE)
+    return os.path.join(LOG_DIR, f"{root}-{os.getpid()}{ext}")
+
+
+def _file_handler():
+    os.makedirs(LOG_DIR, exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(
+        log_file_path(), maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+    )
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+def configure_logging():
+    """
+    Route the root logger through a queue to a rotating file written by one
+    thread. Handlers installed by an embedding app (pytest, uvicorn) stay.
+    """
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None:
+            return _queue_handler
+
+        log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        _queue_handler = DroppingQueueHandler(log_queue)
+        _queue_handler.addFilter(SamplingFilter(LOG_SAMPLE_RATE))
+
+        root = logging.getLogger()
+        # new list rather than in-place edits: a record may be mid-dispatch
+        # over the old one (see _DeferredHandler)
+        root.handlers = _foreign_handlers(root.handlers) + [_queue_handler]
+        root.setLevel(LOG_LEVEL)
+
+        _listener = logging.handlers.QueueListener(log_queue, _file_handler(), respect_handler_level=True)
+        _listener.start()
+        return _queue_handler
+
+
+def shutdown_logging():
+    # drain what is queued, then stop the writer thread
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+
+def dropped_records():
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+class _DeferredHandler(logging.Handler):
+    # stands in on the root logger until the first record, so importing this
+    # module creates no directory, file or thread
+    def emit(self, record):
+        configure_logging().handle(record)
+
+
+def _foreign_handlers(handlers):
+    # root handlers that are not ours, e.g. pytest's capture or uvicorn's
+    return [h for h in handlers if not isinstance(h, (_DeferredHandler, DroppingQueueHandler))]
+
+
+def _reset_after_fork():
+    # the writer thread does not survive fork; worker processes get their own
+    global _listener, _queue_handler, _lock
+    _lock = threading.Lock()
+    if _listener is not None:
+        _listener = None
+        _queue_handler = None
+        root = logging.getLogger()
+        root.handlers = _foreign_handlers(root.handlers) + [_DeferredHandler()]
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+if not any(isinstance(h, (_DeferredHandler, DroppingQueueHandler)) for h in logging.getLogger().handlers):
+    # added next to whatever the embedding app configured, not in its place
+    logging.getLogger().addHandler(_DeferredHandler())
+    logging.getLogger().setLevel(LOG_LEVEL)
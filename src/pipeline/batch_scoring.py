@@ -0,0 +1,205 @@
+import os
+import sys
+import io
+import json
+import time
+import shutil
+import argparse
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from src.logger import logging
+from src.exeption import CustomException
+from src.analytics.kpi import ChurnKPIAccumulator
+from src.pipeline.predict_pipeline import PredictPipeline
+from src.pipeline.native_model import limit_model_threads
+
+
+OUTPUT_COLUMNS = ["customer_id", "churn_probability", "risk_level"]
+
+
+@dataclass
+class BatchScoringConfig:
+    output_dir: str = os.path.join("artifacts", "batch_scores")
+    workers: int = os.cpu_count() or 1
+    # ranges per worker, so one slow range doesn't leave the other cores idle
+    ranges_per_worker: int = 4
+    chunksize: int = 100_000
+
+
+class _RangeReader(io.RawIOBase):
+    # file view over [start, end) so pandas stops at the end of the range
+    def __init__(self, path, start, end):
+        self._file = open(path, "rb")
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._remaining <= 0:
+            return 0
+        n = self._file.readinto(memoryview(buffer)[:min(len(buffer), self._remaining)])
+        self._remaining -= n
+        return n
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def split_row_ranges(path: str, n_ranges: int):
+    """
+    Byte ranges of whole CSV rows (header excluded), roughly equal in size.
+    Assumes no quoted newlines inside fields.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.readline()
+        data_start = f.tell()
+
+        boundaries = [data_start]
+        step = max(1, (size - data_start) // max(1, n_ranges))
+        for i in range(1, n_ranges):
+            f.seek(max(data_start + i * step - 1, boundaries[-1]))
+            f.readline()
+            position = f.tell()
+            if position >= size:
+                break
+            if position > boundaries[-1]:
+                boundaries.append(position)
+        boundaries.append(size)
+
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+_worker_pipeline = None
+
+
+def _init_worker():
+    # runs once per process: load the artifacts and pin XGBoost to one thread.
+    # The registry setting covers hot reloads; a snapshot inherited through
+    # fork was loaded before it, so it is pinned directly
+    global _worker_pipeline
+    _worker_pipeline = PredictPipeline()
+    _worker_pipeline.registry.config.model_threads = 1
+    limit_model_threads(_worker_pipeline.registry.load().model, 1)
+
+
+def _score_range(path, columns, start, end, shard_path, chunksize):
+    kpi = ChurnKPIAccumulator()
+    reader = _RangeReader(path, start, end)
+    try:
+        chunks = pd.read_csv(reader, header=None, names=columns, chunksize=chunksize)
+        for i, predictions in enumerate(_worker_pipeline.predict_chunks(chunks)):
+            kpi.update(predictions)
+            predictions[OUTPUT_COLUMNS].to_csv(
+                shard_path, mode="w" if i == 0 else "a", header=(i == 0), index=False
+            )
+    finally:
+        reader.close()
+    return shard_path, kpi
+
+
+class BatchScorer:
+    def __init__(self, config: BatchScoringConfig = None):
+        self.config = config or BatchScoringConfig()
+
+    def score_file(self, input_path: str):
+        work_dir = None
+        try:
+            logging.info(f"Batch scoring {input_path} with {self.config.workers} workers")
+            start_time = time.perf_counter()
+
+            # shards go to a scratch directory that replaces output_dir at the
+            # end, so a smaller rerun leaves no stale part-* files behind
+            output_dir = os.path.normpath(self.config.output_dir)
+            work_dir = f"{output_dir}.tmp-{os.getpid()}"
+            shutil.rmtree(work_dir, ignore_errors=True)
+            os.makedirs(work_dir)
+            columns = list(pd.read_csv(input_path, nrows=0).columns)
+            ranges = split_row_ranges(
+                input_path, self.config.workers * self.config.ranges_per_worker
+            )
+
+            with ProcessPoolExecutor(
+                max_workers=self.config.workers, initializer=_init_worker
+            ) as pool:
+                futures = [
+                    pool.submit(
+                        _score_range,
+                        input_path,
+                        columns,
+                        start,
+                        end,
+                        os.path.join(work_dir, f"part-{i:05d}.csv"),
+                        self.config.chunksize
+                    )
+                    for i, (start, end) in enumerate(ranges)
+                ]
+
+                # merge in range order so top-k tie-breaking follows file order
+                kpi = ChurnKPIAccumulator()
+                shards = []
+                for future in futures:
+                    shard_path, partial = future.result()
+                    shards.append(os.path.join(output_dir, os.path.basename(shard_path)))
+                    kpi.merge(partial)
+
+            results = kpi.compute_kpis()
+            top_risky = results.pop("top_risky_customers")
+
+            with open(os.path.join(work_dir, "kpis.json"), "w") as f:
+                json.dump(results, f, indent=2)
+            top_risky.to_csv(
+                os.path.join(work_dir, "top_risky_customers.csv"), index=False
+            )
+
+            old_dir = f"{output_dir}.old-{os.getpid()}"
+            if os.path.exists(output_dir):
+                os.replace(output_dir, old_dir)
+            os.replace(work_dir, output_dir)
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+            logging.info(
+                f"Batch scoring completed: {results['total_customers']} rows, "
+                f"{len(shards)} shards in {time.perf_counter() - start_time:.1f}s"
+            )
+            results["top_risky_customers"] = top_risky
+            return shards, results
+
+        except Exception as e:
+            logging.error("Exception occurred in batch scoring")
+            if work_dir is not None:
+                shutil.rmtree(work_dir, ignore_errors=True)
+            raise CustomException(e, sys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a customer CSV on a process pool")
+    parser.add_argument("input_path")
+    parser.add_argument("--output-dir", default=BatchScoringConfig.output_dir)
+    parser.add_argument("--workers", type=int, default=BatchScoringConfig.workers)
+    parser.add_argument("--chunksize", type=int, default=BatchScoringConfig.chunksize)
+    args = parser.parse_args()
+
+    scorer = BatchScorer(BatchScoringConfig(
+        output_dir=args.output_dir,
+        workers=args.workers,
+        chunksize=args.chunksize
+    ))
+    shards, results = scorer.score_file(args.input_path)
+
+    print("\n===== KPI SUMMARY =====")
+    print("Shards written:", len(shards))
+    print("Total customers:", results["total_customers"])
+    print("High risk customers:", results["high_risk_customers"])
+    print("Medium risk customers:", results["medium_risk_customers"])
+    print("Low risk customers:", results["low_risk_customers"])
+    print("Average churn probability:", results["average_churn_probability"])
+
+    print("\n===== TOP 5 RISKY CUSTOMERS =====")
+    print(results["top_risky_customers"].head())
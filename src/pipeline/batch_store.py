@@ -0,0 +1,390 @@
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.logger import logging
+from src.exeption import CustomException
+from src.analytics.kpi import ChurnKPIAccumulator
+from src.pipeline.fast_path import RISK_LABELS
+
+
+@dataclass
+class BatchStoreConfig:
+    root: str = os.getenv("BATCH_STORE_DIR", os.path.join("artifacts", "batches"))
+    # sealed batches kept on disk; the oldest are removed past this
+    max_batches: int = int(os.getenv("BATCH_STORE_MAX_BATCHES", "20"))
+    # sealed job results are counted apart, so ad-hoc batches never evict them
+    max_job_batches: int = int(os.getenv("BATCH_STORE_MAX_JOB_BATCHES", "50"))
+    # open batches with no chunk uploaded for this long are abandoned
+    open_ttl_seconds: float = float(os.getenv("BATCH_STORE_OPEN_TTL", "86400"))
+    # sealed batches kept memory-mapped between requests
+    open_batches: int = 8
+    max_page_size: int = int(os.getenv("BATCH_STORE_MAX_PAGE", "10000"))
+    histogram_bins: int = 30
+
+
+class BatchNotFound(KeyError):
+    pass
+
+
+class BatchNotReady(Exception):
+    pass
+
+
+SORTS = ("churn_probability", "row")
+_ARRAYS = ("customer_id", "churn_probability", "risk_code", "order", "sorted_negated")
+
+
+def probability_histogram(churn_prob, bins: int):
+    counts, _ = np.histogram(np.asarray(churn_prob, dtype=np.float64), bins=bins, range=(0.0, 1.0))
+    return counts.tolist()
+
+
+def _risk_codes(risk_level: pd.Series) -> np.ndarray:
+    # index into RISK_LABELS, -1 where pd.cut left the row unbucketed
+    codes = pd.Categorical(risk_level, categories=list(RISK_LABELS)).codes
+    return np.asarray(codes, dtype=np.int8)
+
+
+class BatchStore:
+    """
+    Scored batches kept server-side so clients page through them instead of
+    downloading every row.
+
+    A batch is filled chunk by chunk while open, then sealed: the chunks are
+    joined into column files on disk and a descending churn_probability sort
+    index is built once. Risk levels are probability bins, so every filter is
+    a contiguous slice of that index: risk levels by their recorded bounds,
+    probability ranges by binary search.
+    """
+
+    def __init__(self, config: BatchStoreConfig = None):
+        self.config = config or BatchStoreConfig()
+        self._open = OrderedDict()
+        self._lock = threading.Lock()
+        # per open batch: a chunk is either in the sealed batch or refused
+        self._write_locks = {}
+
+    def _write_lock(self, batch_id: str):
+        with self._lock:
+            return self._write_locks.setdefault(batch_id, threading.Lock())
+
+    def _path(self, batch_id: str, *parts):
+        # ids are generated here; anything else is not a batch
+        if not batch_id or not all(c in "0123456789abcdef" for c in batch_id):
+            raise BatchNotFound(batch_id)
+        return os.path.join(self.config.root, batch_id, *parts)
+
+    def _write_meta(self, batch_id: str, meta: dict):
+        tmp_path = self._path(batch_id, "meta.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._path(batch_id, "meta.json"))
+
+    def get(self, batch_id: str) -> dict:
+        try:
+            with open(self._path(batch_id, "meta.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise BatchNotFound(batch_id)
+
+    def list(self):
+        if not os.path.isdir(self.config.root):
+            return []
+        metas = []
+        for batch_id in os.listdir(self.config.root):
+            try:
+                metas.append(self.get(batch_id))
+            except BatchNotFound:
+                continue
+        return sorted(metas, key=lambda meta: meta["created_at"], reverse=True)
+
+    def create(self, model_version: str, job_id: Optional[str] = None) -> dict:
+        batch_id = uuid.uuid4().hex
+        os.makedirs(self._path(batch_id, "chunks"))
+        meta = {
+            "batch_id": batch_id,
+            "status": "open",
+            "model_version": model_version,
+            "created_at": time.time(),
+            "job_id": job_id
+        }
+        self._write_meta(batch_id, meta)
+        self._prune_open()
+        return meta
+
+    def add_chunk(self, batch_id: str, index: int, predictions: pd.DataFrame):
+        """Store one scored chunk; chunks are joined in index order on seal."""
+        if index < 0:
+            raise ValueError("chunk index must not be negative")
+        columns = {
+            "customer_id": predictions["customer_id"].to_numpy(dtype=np.int64),
+            "churn_probability": predictions["churn_probability"].to_numpy(),
+            "risk_code": _risk_codes(predictions["risk_level"])
+        }
+
+        with self._write_lock(batch_id):
+            # checked under the lock, or a seal could remove the chunk after it was accepted
+            if self.get(batch_id)["status"] != "open":
+                raise BatchNotReady(f"batch {batch_id} is already sealed")
+            tmp_path = self._path(batch_id, "chunks", f"{index:08d}.tmp.npz")
+            np.savez(tmp_path, **columns)
+            # a resent chunk replaces the earlier copy
+            os.replace(tmp_path, self._path(batch_id, "chunks", f"{index:08d}.npz"))
+
+    def seal(self, batch_id: str) -> dict:
+        with self._write_lock(batch_id):
+            meta = self._seal(batch_id)
+        with self._lock:
+            self._write_locks.pop(batch_id, None)
+        return meta
+
+    def _seal(self, batch_id: str) -> dict:
+        try:
+            meta = self.get(batch_id)
+            if meta["status"] != "open":
+                return meta
+            start_time = time.perf_counter()
+
+            chunk_dir = self._path(batch_id, "chunks")
+            names = sorted(n for n in os.listdir(chunk_dir) if n.endswith(".npz") and ".tmp" not in n)
+            parts = []
+            for name in names:
+                with np.load(os.path.join(chunk_dir, name)) as part:
+                    parts.append({key: part[key] for key in ("customer_id", "churn_probability", "risk_code")})
+
+            if parts:
+                columns = {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+            else:
+                columns = {
+                    "customer_id": np.empty(0, dtype=np.int64),
+                    "churn_probability": np.empty(0, dtype=np.float64),
+                    "risk_code": np.empty(0, dtype=np.int8)
+                }
+
+            churn_prob = columns["churn_probability"]
+            # descending, ties keep file order; NaN sorts last
+            columns["order"] = np.argsort(-churn_prob, kind="stable")
+            columns["sorted_negated"] = -churn_prob[columns["order"]]
+
+            # each risk level is one run of the sorted index; the bounds come
+            # from the stored labels so filters agree exactly with the KPIs
+            sorted_codes = columns["risk_code"][columns["order"]]
+            risk_ranges = {}
+            for code, level in enumerate(RISK_LABELS):
+                positions = np.flatnonzero(sorted_codes == code)
+                risk_ranges[level] = (
+                    [int(positions[0]), int(positions[-1]) + 1] if len(positions) else [0, 0]
+                )
+
+            for key in _ARRAYS:
+                np.save(self._path(batch_id, f"{key}.npy"), columns[key])
+            shutil.rmtree(chunk_dir)
+
+            valid = churn_prob[~np.isnan(churn_prob)]
+            kpis = ChurnKPIAccumulator(top_k=0).update(
+                pd.DataFrame({"churn_probability": churn_prob, "risk_level": self._labels(columns["risk_code"])})
+            ).compute_kpis()
+            kpis.pop("top_risky_customers")
+            # an empty batch has no average or maximum, and meta is served as JSON
+            kpis = {key: None if isinstance(value, float) and np.isnan(value) else value for key, value in kpis.items()}
+
+            meta.update({
+                "status": "sealed",
+                "rows": int(len(churn_prob)),
+                "chunks": len(parts),
+                "sealed_at": time.time(),
+                "kpis": kpis,
+                "risk_ranges": risk_ranges,
+                "probability_stats": {
+                    "max": float(valid.max()) if len(valid) else None,
+                    "min": float(valid.min()) if len(valid) else None,
+                    "std": float(valid.std(ddof=1)) if len(valid) > 1 else None,
+                    "median": float(np.median(valid)) if len(valid) else None
+                },
+                "histogram": {
+                    "range": [0.0, 1.0],
+                    "counts": probability_histogram(valid, self.config.histogram_bins)
+                }
+            })
+            self._write_meta(batch_id, meta)
+            logging.info(
+                f"Batch {batch_id} sealed: {meta['rows']} rows in "
+                f"{time.perf_counter() - start_time:.2f}s"
+            )
+
+            self._prune()
+            return meta
+
+        except BatchNotFound:
+            raise
+        except Exception as e:
+            logging.error(f"Exception occurred while sealing batch {batch_id}")
+            raise CustomException(e, sys)
+
+    def delete(self, batch_id: str):
+        path = self._path(batch_id)
+        if not os.path.isdir(path):
+            raise BatchNotFound(batch_id)
+        with self._lock:
+            self._open.pop(batch_id, None)
+            self._write_locks.pop(batch_id, None)
+        shutil.rmtree(path, ignore_errors=True)
+
+    def _prune(self):
+        sealed = [meta for meta in self.list() if meta["status"] == "sealed"]
+        for owned, limit, setting in (
+            (False, self.config.max_batches, "BATCH_STORE_MAX_BATCHES"),
+            (True, self.config.max_job_batches, "BATCH_STORE_MAX_JOB_BATCHES"),
+        ):
+            group = [meta for meta in sealed if bool(meta.get("job_id")) == owned]
+            for meta in group[limit:]:
+                logging.info(f"Removing batch {meta['batch_id']}, past {setting}")
+                self._remove(meta["batch_id"])
+        self._prune_open()
+
+    def _prune_open(self):
+        if not self.config.open_ttl_seconds:
+            return
+        expired = time.time() - self.config.open_ttl_seconds
+        for meta in self.list():
+            if meta["status"] != "open":
+                continue
+            try:
+                # the chunk directory changes with every upload
+                last_active = os.stat(self._path(meta["batch_id"], "chunks")).st_mtime
+            except FileNotFoundError:
+                continue
+            if max(meta["created_at"], last_active) < expired:
+                logging.info(f"Removing batch {meta['batch_id']}, open past BATCH_STORE_OPEN_TTL")
+                self._remove(meta["batch_id"])
+
+    def _remove(self, batch_id: str):
+        try:
+            self.delete(batch_id)
+        except BatchNotFound:
+            # removed by another request in the meantime
+            pass
+
+    def _arrays(self, batch_id: str):
+        with self._lock:
+            arrays = self._open.get(batch_id)
+            if arrays is not None:
+                self._open.move_to_end(batch_id)
+                return arrays
+
+        meta = self.get(batch_id)
+        if meta["status"] != "sealed":
+            raise BatchNotReady(f"batch {batch_id} is still open")
+        # memory-mapped: a page only reads the rows it returns
+        arrays = {key: np.load(self._path(batch_id, f"{key}.npy"), mmap_mode="r") for key in _ARRAYS}
+        arrays["risk_ranges"] = meta["risk_ranges"]
+
+        with self._lock:
+            self._open[batch_id] = arrays
+            while len(self._open) > self.config.open_batches:
+                self._open.popitem(last=False)
+        return arrays
+
+    @staticmethod
+    def _labels(risk_code: np.ndarray):
+        labels = np.array(list(RISK_LABELS) + [None], dtype=object)
+        return labels[risk_code]
+
+    @staticmethod
+    def _sorted_range(arrays, risk_level, min_probability, max_probability):
+        # positions [start, stop) of the descending index that pass every filter
+        sorted_negated = arrays["sorted_negated"]
+        start, stop = 0, len(sorted_negated)
+
+        if risk_level is not None:
+            if risk_level not in RISK_LABELS:
+                raise ValueError(f"risk_level must be one of {', '.join(RISK_LABELS)}")
+            start, stop = arrays["risk_ranges"][risk_level]
+
+        if min_probability is not None:
+            stop = min(stop, int(np.searchsorted(sorted_negated, -min_probability, side="right")))
+        if max_probability is not None:
+            start = max(start, int(np.searchsorted(sorted_negated, -max_probability, side="left")))
+
+        return start, max(start, stop)
+
+    def query(
+        self,
+        batch_id: str,
+        offset: int = 0,
+        limit: int = 100,
+        sort: str = "churn_probability",
+        descending: Optional[bool] = None,
+        risk_level: Optional[str] = None,
+        min_probability: Optional[float] = None,
+        max_probability: Optional[float] = None
+    ):
+        """
+        One page of a sealed batch. Returns (rows matching the filters, page
+        as a customer_id / churn_probability / risk_level frame). By default
+        probabilities are highest first and rows are in file order.
+        """
+        if sort not in SORTS:
+            raise ValueError(f"sort must be one of {', '.join(SORTS)}")
+        if offset < 0 or limit < 0:
+            raise ValueError("offset and limit must not be negative")
+        limit = min(limit, self.config.max_page_size)
+        if descending is None:
+            descending = sort == "churn_probability"
+
+        arrays = self._arrays(batch_id)
+        start, stop = self._sorted_range(arrays, risk_level, min_probability, max_probability)
+        total = stop - start
+        filtered = total != len(arrays["order"])
+
+        if sort == "churn_probability":
+            if descending:
+                rows = arrays["order"][start + offset:min(stop, start + offset + limit)]
+            else:
+                first = max(start, stop - offset - limit)
+                rows = arrays["order"][first:max(first, stop - offset)][::-1]
+        elif filtered:
+            rows = np.sort(arrays["order"][start:stop])
+            rows = rows[::-1] if descending else rows
+            rows = rows[offset:offset + limit]
+        else:
+            if descending:
+                rows = np.arange(total - 1 - offset, max(-1, total - 1 - offset - limit), -1)
+            else:
+                rows = np.arange(offset, min(total, offset + limit))
+
+        rows = np.asarray(rows)
+        page = pd.DataFrame({
+            "customer_id": arrays["customer_id"][rows],
+            "churn_probability": arrays["churn_probability"][rows],
+            "risk_level": self._labels(arrays["risk_code"][rows])
+        })
+        return total, page
+
+    def iter_frames(self, batch_id: str, risk_level: Optional[str] = None, chunksize: int = 100_000):
+        """Whole batch in file order, optionally one risk level, chunk by chunk."""
+        arrays = self._arrays(batch_id)
+        rows = None
+        if risk_level is not None:
+            start, stop = self._sorted_range(arrays, risk_level, None, None)
+            rows = np.sort(arrays["order"][start:stop])
+        total = len(arrays["order"]) if rows is None else len(rows)
+
+        for begin in range(0, total, chunksize):
+            index = slice(begin, begin + chunksize) if rows is None else rows[begin:begin + chunksize]
+            yield pd.DataFrame({
+                "customer_id": arrays["customer_id"][index],
+                "churn_probability": arrays["churn_probability"][index],
+                "risk_level": self._labels(arrays["risk_code"][index])
+            })
@@ -0,0 +1,229 @@
+from typing import List, Mapping, Optional
+
+import numpy as np
+
+
+RISK_BINS = (0.0, 0.4, 0.7, 1.0)
+RISK_LABELS = ("Low", "Medium", "High")
+
+
+def risk_level_for(churn_prob: float) -> Optional[str]:
+    # same right-closed bins as pd.cut(..., bins=RISK_BINS) in PredictPipeline
+    for upper, label in zip(RISK_BINS[1:], RISK_LABELS):
+        if RISK_BINS[0] < churn_prob <= upper:
+            return label
+    return None
+
+
+class _NumericBlock:
+    kind = "numeric"
+
+    def __init__(self, columns, fill, mean, scale):
+        self.columns = list(columns)
+        self.fill = fill
+        self.mean = mean
+        self.scale = scale
+
+    @property
+    def width(self):
+        return len(self.columns)
+
+    def _finish(self, values):
+        if self.fill is not None:
+            missing = np.isnan(values)
+            if missing.any():
+                values[missing] = np.broadcast_to(self.fill, values.shape)[missing]
+        if self.mean is not None:
+            values -= self.mean
+        if self.scale is not None:
+            values /= self.scale
+        return values
+
+    def write(self, record, out):
+        values = np.array(
+            [np.nan if record[c] is None else record[c] for c in self.columns],
+            dtype=np.float64
+        )
+        out[:] = self._finish(values)
+
+    def write_frame(self, df, out):
+        out[:] = self._finish(df[self.columns].to_numpy(dtype=np.float64, na_value=np.nan))
+
+    def arrays(self):
+        return {"fill": self.fill, "mean": self.mean, "scale": self.scale}
+
+
+class _CategoricalBlock:
+    kind = "categorical"
+
+    def __init__(self, columns, fill, categories):
+        self.columns = list(columns)
+        self.fill = fill
+        self.categories = [list(c) for c in categories]
+        self.offsets = np.cumsum([0] + [len(c) for c in categories[:-1]])
+        self.lookup = [{v: i for i, v in enumerate(c)} for c in categories]
+
+    @property
+    def width(self):
+        return sum(len(c) for c in self.categories)
+
+    def write(self, record, out):
+        out[:] = 0.0
+        for j, column in enumerate(self.columns):
+            value = record[column]
+            # SimpleImputer on an object column only imputes float NaN (x != x);
+            # None goes through and one-hot encodes as an unknown category
+            if isinstance(value, float) and np.isnan(value):
+                if self.fill is None:
+                    continue
+                value = self.fill[j]
+            idx = self.lookup[j].get(value)
+            # handle_unknown='ignore' -> all zeros for unseen categories
+            if idx is not None:
+                out[self.offsets[j] + idx] = 1.0
+
+    def write_frame(self, df, out):
+        import pandas as pd
+
+        out[:] = 0.0
+        rows = np.arange(len(df))
+        for j, column in enumerate(self.columns):
+            values = df[column]
+            if self.fill is not None:
+                raw = values.to_numpy(dtype=object)
+                # NaN only, like write(); None stays an unknown category
+                missing = values.isna().to_numpy() & (raw != None)  # noqa: E711
+                values = values.astype(object).where(~missing, self.fill[j])
+            # -1 for unseen values; pd.Categorical warns on those and will raise
+            codes = pd.Index(self.categories[j]).get_indexer(values)
+            known = codes >= 0
+            out[rows[known], self.offsets[j] + codes[known]] = 1.0
+
+    def arrays(self):
+        return {"fill": None if self.fill is None else np.asarray(self.fill, dtype=str)}
+
+
+class CompiledPreprocessor:
+    """
+    Plain NumPy copy of the fitted ColumnTransformer from DataTransformation.
+
+    Turns customer records or frames into the same feature matrix that
+    preprocessor.transform() produces, without sklearn at predict time.
+    """
+
+    def __init__(self, blocks: List[object]):
+        self.blocks = blocks
+        self.n_features = sum(b.width for b in blocks)
+
+    @classmethod
+    def from_preprocessor(cls, preprocessor) -> "CompiledPreprocessor":
+        from sklearn.impute import SimpleImputer
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+        blocks = []
+        for name, transformer, columns in preprocessor.transformers_:
+            if isinstance(transformer, str) and transformer == "drop" or len(columns) == 0:
+                continue
+            if isinstance(transformer, str):
+                raise ValueError(f"{transformer} columns in '{name}' are not supported")
+
+            steps = transformer.steps if isinstance(transformer, Pipeline) else [(name, transformer)]
+
+            fill = mean = scale = categories = None
+            for _, step in steps:
+                if isinstance(step, SimpleImputer):
+                    fill = step.statistics_
+                elif isinstance(step, StandardScaler):
+                    mean, scale = step.mean_, step.scale_
+                elif isinstance(step, OneHotEncoder):
+                    if step.drop_idx_ is not None:
+                        raise ValueError(f"OneHotEncoder with drop in '{name}' is not supported")
+                    categories = step.categories_
+                else:
+                    raise ValueError(f"unsupported step {type(step).__name__} in '{name}'")
+
+            if categories is not None:
+                blocks.append(_CategoricalBlock(columns, fill, categories))
+            else:
+                blocks.append(_NumericBlock(
+                    columns,
+                    None if fill is None else np.asarray(fill, dtype=np.float64),
+                    mean,
+                    scale
+                ))
+
+        return cls(blocks)
+
+    def transform_record(self, record: Mapping) -> np.ndarray:
+        out = np.empty((1, self.n_features), dtype=np.float64)
+        start = 0
+        for block in self.blocks:
+            block.write(record, out[0, start:start + block.width])
+            start += block.width
+        return out
+
+    def transform_records(self, records) -> np.ndarray:
+        out = np.empty((len(records), self.n_features), dtype=np.float64)
+        for i, record in enumerate(records):
+            start = 0
+            for block in self.blocks:
+                block.write(record, out[i, start:start + block.width])
+                start += block.width
+        return out
+
+    def transform(self, df) -> np.ndarray:
+        # drop-in for ColumnTransformer.transform on a DataFrame
+        out = np.empty((len(df), self.n_features), dtype=np.float64)
+        start = 0
+        for block in self.blocks:
+            block.write_frame(df, out[:, start:start + block.width])
+            start += block.width
+        return out
+
+    def save_npz(self, file_path):
+        arrays = {"n_blocks": np.array(len(self.blocks))}
+        for i, block in enumerate(self.blocks):
+            arrays[f"{i}.kind"] = np.array(block.kind)
+            arrays[f"{i}.columns"] = np.asarray(block.columns, dtype=str)
+            for name, value in block.arrays().items():
+                if value is not None:
+                    arrays[f"{i}.{name}"] = value
+            if block.kind == "categorical":
+                for j, categories in enumerate(block.categories):
+                    arrays[f"{i}.categories.{j}"] = np.asarray(categories, dtype=str)
+        from src.utils import atomic_path
+
+        with atomic_path(file_path) as tmp_path:
+            np.savez(tmp_path, **arrays)
+
+    @classmethod
+    def load_npz(cls, file_path) -> "CompiledPreprocessor":
+        with np.load(file_path, allow_pickle=False) as data:
+            def get(key):
+                return data[key] if key in data.files else None
+
+            blocks = []
+            for i in range(int(data["n_blocks"])):
+                columns = data[f"{i}.columns"].tolist()
+                if str(data[f"{i}.kind"]) == "categorical":
+                    fill = get(f"{i}.fill")
+                    blocks.append(_CategoricalBlock(
+                        columns,
+                        None if fill is None else fill.tolist(),
+                        [data[f"{i}.categories.{j}"].tolist() for j in range(len(columns))]
+                    ))
+                else:
+                    blocks.append(_NumericBlock(
+                        columns, get(f"{i}.fill"), get(f"{i}.mean"), get(f"{i}.scale")
+                    ))
+        return cls(blocks)
+
+
+def compile_preprocessor(preprocessor) -> Optional[CompiledPreprocessor]:
+    if isinstance(preprocessor, CompiledPreprocessor):
+        return preprocessor
+    try:
+        return CompiledPreprocessor.from_preprocessor(preprocessor)
+    except (ValueError, AttributeError):
+        return None
@@ -0,0 +1,333 @@
+import os
+import sys
+import json
+import time
+import uuid
+import sqlite3
+import argparse
+import threading
+from dataclasses import dataclass
+
+import pandas as pd
+
+from src.logger import logging
+from src.exeption import CustomException
+from src.analytics.kpi import ChurnKPIAccumulator
+from src.pipeline.batch_store import BatchStore, BatchNotFound
+from src.pipeline.predict_pipeline import PredictPipeline
+
+
+@dataclass
+class JobQueueConfig:
+    path: str = os.getenv("JOB_QUEUE_PATH", os.path.join("artifacts", "jobs", "jobs.sqlite"))
+    upload_dir: str = os.getenv("JOB_UPLOAD_DIR", os.path.join("artifacts", "jobs", "uploads"))
+    # worker threads started with the API; 0 leaves jobs to `python -m src.pipeline.job_queue`
+    workers: int = int(os.getenv("JOB_WORKERS", "1"))
+    chunksize: int = int(os.getenv("JOB_CHUNKSIZE", "100000"))
+    poll_interval: float = 0.5
+    # a running job whose worker has not reported for this long is picked up again
+    lease_seconds: float = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+    max_attempts: int = 3
+    target_column: str = "churn"
+
+
+class JobNotFound(KeyError):
+    pass
+
+
+class LeaseLost(Exception):
+    """The job was claimed again by another worker after this one's lease ran out."""
+
+
+_COLUMNS = (
+    "job_id", "status", "filename", "created_at", "started_at", "finished_at",
+    "heartbeat_at", "attempts", "rows_done", "rows_total", "kpis", "batch_id", "error"
+)
+
+
+def count_rows(path: str) -> int:
+    # data rows of a CSV file, header excluded; no quoted newlines assumed
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(16 * 1024 * 1024), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(0, lines - 1)
+
+
+class JobQueue:
+    """
+    Scoring jobs in a local SQLite file: no broker, and any process on the
+    host pointing at the same file can submit jobs or work them.
+
+    Workers claim jobs in a write transaction and report progress after
+    every chunk; that report doubles as a heartbeat, so a job left running
+    by a dead worker is claimed again once its lease runs out.
+    """
+
+    def __init__(self, config: JobQueueConfig = None):
+        self.config = config or JobQueueConfig()
+        self._local = threading.local()
+        # the file is created on first use, not when the API module is imported
+        self._created = False
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.config.path)), exist_ok=True)
+            conn = sqlite3.connect(self.config.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._created:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS jobs ("
+                    "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, filename TEXT, "
+                    "created_at REAL NOT NULL, started_at REAL, finished_at REAL, heartbeat_at REAL, "
+                    "attempts INTEGER NOT NULL DEFAULT 0, rows_done INTEGER NOT NULL DEFAULT 0, "
+                    "rows_total INTEGER, kpis TEXT, batch_id TEXT, error TEXT)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+                self._created = True
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex
+
+    def upload_path(self, job_id: str) -> str:
+        os.makedirs(self.config.upload_dir, exist_ok=True)
+        return os.path.join(self.config.upload_dir, f"{job_id}.csv")
+
+    def submit(self, job_id: str, filename: str = None) -> dict:
+        """Queue a job whose upload is already at upload_path(job_id)."""
+        self._connect().execute(
+            "INSERT INTO jobs (job_id, status, filename, created_at) VALUES (?, 'queued', ?, ?)",
+            (job_id, filename, time.time())
+        )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> dict:
+        row = self._connect().execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            raise JobNotFound(job_id)
+        job = dict(zip(_COLUMNS, row))
+        job["kpis"] = json.loads(job["kpis"]) if job["kpis"] else None
+        return job
+
+    def list(self, limit: int = 50):
+        rows = self._connect().execute(
+            "SELECT job_id FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [self.get(job_id) for (job_id,) in rows]
+
+    def claim(self):
+        """
+        Oldest queued job, or one whose worker stopped reporting; None when
+        idle. The returned job's attempts number is the claim: updates made
+        with an older one are ignored.
+        """
+        now = time.time()
+        expired = now - self.config.lease_seconds
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, "
+                "error = 'worker stopped responding ' || attempts || ' times' "
+                "WHERE status = 'running' AND heartbeat_at < ? AND attempts >= ?",
+                (now, expired, self.config.max_attempts)
+            )
+            row = conn.execute(
+                "SELECT job_id FROM jobs WHERE status = 'queued' "
+                "OR (status = 'running' AND heartbeat_at < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (expired,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ?, heartbeat_at = ?, "
+                    "attempts = attempts + 1, rows_done = 0, kpis = NULL WHERE job_id = ?",
+                    (now, now, row[0])
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return self.get(row[0]) if row is not None else None
+
+    def update(self, job_id: str, attempt: int, **fields) -> bool:
+        """Report on a claimed job; False when that claim is no longer the current one."""
+        if "kpis" in fields and fields["kpis"] is not None:
+            fields["kpis"] = json.dumps(fields["kpis"], default=str)
+        fields["heartbeat_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        cursor = self._connect().execute(
+            f"UPDATE jobs SET {assignments} WHERE job_id = ? AND status = 'running' AND attempts = ?",
+            (*fields.values(), job_id, attempt)
+        )
+        return cursor.rowcount == 1
+
+    def requeue(self, job_id: str, attempt: int) -> bool:
+        # handed back by a worker that is shutting down; not a failed attempt
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = 'queued', attempts = attempts - 1 "
+            "WHERE job_id = ? AND status = 'running' AND attempts = ?",
+            (job_id, attempt)
+        )
+        return cursor.rowcount == 1
+
+    def stats(self):
+        counts = dict(self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+        return {"path": self.config.path, "workers": self.config.workers, "by_status": counts}
+
+
+class JobWorker:
+    """
+    Background thread that scores queued CSV uploads chunk by chunk into a
+    server-side batch, so results are paged and exported like any batch.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        pipeline: PredictPipeline = None,
+        batch_store: BatchStore = None,
+        name: str = "job-worker"
+    ):
+        self.queue = queue
+        self.pipeline = pipeline or PredictPipeline()
+        self.batch_store = batch_store or BatchStore()
+        self.name = name
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run_forever, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        # the job in progress finishes its current chunk; an unfinished job
+        # is picked up again after its lease
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim()
+            except Exception as e:
+                logging.error(f"{self.name} could not claim a job: {e}")
+                job = None
+            if job is None:
+                self._stop.wait(self.queue.config.poll_interval)
+                continue
+            self.run_job(job)
+
+    def _report(self, job_id: str, attempt: int, **fields):
+        if not self.queue.update(job_id, attempt, **fields):
+            raise LeaseLost(f"job {job_id} attempt {attempt} was claimed again by another worker")
+
+    def run_job(self, job: dict):
+        job_id = job["job_id"]
+        attempt = job["attempts"]
+        upload_path = self.queue.upload_path(job_id)
+        batch_id = None
+        try:
+            logging.info(f"Job {job_id} started (attempt {attempt})")
+            start_time = time.perf_counter()
+
+            if job["batch_id"]:
+                # left half-written by an earlier attempt
+                try:
+                    self.batch_store.delete(job["batch_id"])
+                except BatchNotFound:
+                    pass
+
+            batch_id = self.batch_store.create(
+                self.pipeline.registry.get().version, job_id=job_id
+            )["batch_id"]
+            self._report(job_id, attempt, batch_id=batch_id, rows_total=count_rows(upload_path))
+
+            kpi = ChurnKPIAccumulator(top_k=0)
+            reader = pd.read_csv(upload_path, chunksize=self.queue.config.chunksize)
+            for index, chunk in enumerate(reader):
+                if self._stop.is_set():
+                    logging.info(f"Job {job_id} interrupted by shutdown, back in the queue")
+                    if not self.queue.requeue(job_id, attempt):
+                        raise LeaseLost(f"job {job_id} was claimed again before it could be requeued")
+                    return
+
+                chunk = chunk.drop(columns=[self.queue.config.target_column], errors="ignore")
+                predictions = self.pipeline.predict(chunk)
+                self.batch_store.add_chunk(batch_id, index, predictions)
+                kpi.update(predictions)
+
+                partial = kpi.compute_kpis()
+                partial.pop("top_risky_customers")
+                self._report(job_id, attempt, rows_done=kpi.total_customers, kpis=partial)
+
+            meta = self.batch_store.seal(batch_id)
+            self._report(
+                job_id, attempt, status="done", finished_at=time.time(),
+                rows_done=meta["rows"], kpis=meta["kpis"]
+            )
+            # only the worker whose claim is current gets here
+            os.remove(upload_path)
+            logging.info(
+                f"Job {job_id} done: {meta['rows']} rows in "
+                f"{time.perf_counter() - start_time:.1f}s, batch {batch_id}"
+            )
+
+        except LeaseLost as e:
+            # the upload and the job belong to the new owner; only this
+            # attempt's batch is ours to clean up
+            logging.warning(f"Job {job_id} abandoned: {e}")
+            self._discard_batch(batch_id)
+
+        except Exception as e:
+            error = CustomException(e, sys)
+            logging.error(f"Job {job_id} failed: {error}")
+            if self.queue.update(job_id, attempt, status="failed", finished_at=time.time(), error=str(error)):
+                if os.path.exists(upload_path):
+                    os.remove(upload_path)
+            else:
+                logging.warning(f"Job {job_id} attempt {attempt} was claimed again, leaving it to the new owner")
+                self._discard_batch(batch_id)
+
+    def _discard_batch(self, batch_id):
+        if batch_id is None:
+            return
+        try:
+            self.batch_store.delete(batch_id)
+        except BatchNotFound:
+            pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Work scoring jobs from the local job queue")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    queue = JobQueue()
+    pipeline = PredictPipeline()
+    batch_store = BatchStore()
+    workers = [
+        JobWorker(queue, pipeline, batch_store, name=f"job-worker-{i}")
+        for i in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    print(f"Working jobs from {queue.config.path} with {args.workers} worker(s); Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.stop()
@@ -0,0 +1,240 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from src.utils import load_object, file_digest, atomic_path
+from src.logger import logging
+from src.exeption import CustomException
+from src.metrics import stage
+from src.pipeline.fast_path import CompiledPreprocessor, compile_preprocessor
+from src.pipeline.native_model import (
+    NATIVE_MANIFEST,
+    NATIVE_PREPROCESSOR,
+    limit_model_threads,
+    load_native_artifacts,
+    native_artifacts_exist,
+)
+
+
+PROJECT_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+ARTIFACT_MANIFEST = "manifest.json"
+
+
+def write_artifact_manifest(directory):
+    """
+    Record the digest of every serving artifact in `directory`. Training
+    writes this last, after the model and preprocessor files are in place;
+    the registry only reloads when it changes and only accepts files that
+    match it, so a new preprocessor is never paired with an old model.
+    """
+    try:
+        names = ["model.pkl", "preprocessor.pkl", NATIVE_MANIFEST, NATIVE_PREPROCESSOR]
+        native_manifest = os.path.join(directory, NATIVE_MANIFEST)
+        if os.path.exists(native_manifest):
+            with open(native_manifest) as f:
+                names.append(json.load(f)["file"])
+
+        files = {
+            name: file_digest(os.path.join(directory, name))
+            for name in names if os.path.exists(os.path.join(directory, name))
+        }
+        version = hashlib.sha256(
+            "".join(f"{name}={digest}" for name, digest in sorted(files.items())).encode()
+        ).hexdigest()[:16]
+
+        with atomic_path(os.path.join(directory, ARTIFACT_MANIFEST)) as tmp_path:
+            with open(tmp_path, "w") as f:
+                json.dump({"version": version, "created_at": time.time(), "files": files}, f, indent=2)
+        logging.info(f"artifact manifest written (version {version})")
+        return version
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+@dataclass
+class ModelRegistryConfig:
+    model_path: str = os.path.join(PROJECT_ROOT, "artifacts", "model.pkl")
+    preprocessor_path: str = os.path.join(PROJECT_ROOT, "artifacts", "preprocessor.pkl")
+    native_dir: str = os.path.join(PROJECT_ROOT, "artifacts")
+    # written last by training; without one, every artifact file is watched
+    manifest_path: str = os.path.join(PROJECT_ROOT, "artifacts", ARTIFACT_MANIFEST)
+    # pickle | native | auto (native when the exported files exist)
+    artifact_format: str = os.getenv("MODEL_ARTIFACT_FORMAT", "pickle")
+    # how often (seconds) the artifact files are stat'ed for changes
+    check_interval: float = float(os.getenv("MODEL_CHECK_INTERVAL", "5"))
+    # threads per prediction inside the model; 0 leaves XGBoost on every core
+    model_threads: int = int(os.getenv("MODEL_THREADS", "0"))
+
+
+@dataclass(frozen=True)
+class ModelArtifacts:
+    model: object
+    preprocessor: object
+    version: str
+    loaded_at: float
+    # None when the preprocessor has steps the fast path can't reproduce
+    compiled_preprocessor: Optional[CompiledPreprocessor] = None
+
+
+class ModelRegistry:
+    """
+    Keeps the model and preprocessor resident in memory.
+
+    Callers get an immutable ModelArtifacts snapshot. A reload builds a new
+    snapshot and swaps the reference, so requests already holding the old
+    snapshot finish with it and nobody waits on the reload.
+    """
+
+    def __init__(self, config: Optional[ModelRegistryConfig] = None):
+        self.config = config or ModelRegistryConfig()
+        self._artifacts: Optional[ModelArtifacts] = None
+        self._mtimes = None
+        self._last_check = 0.0
+        self._reload_lock = threading.Lock()
+
+    def _use_native(self) -> bool:
+        if self.config.artifact_format == "native":
+            return True
+        if self.config.artifact_format == "auto":
+            return native_artifacts_exist(self.config.native_dir)
+        return False
+
+    def _artifact_files(self):
+        if not self._use_native():
+            return [self.config.model_path, self.config.preprocessor_path]
+
+        manifest_path = os.path.join(self.config.native_dir, NATIVE_MANIFEST)
+        with open(manifest_path) as f:
+            model_file = json.load(f)["file"]
+        return [
+            manifest_path,
+            os.path.join(self.config.native_dir, model_file),
+            os.path.join(self.config.native_dir, NATIVE_PREPROCESSOR),
+        ]
+
+    def _read_manifest(self):
+        try:
+            with open(self.config.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _stat_mtimes(self):
+        if os.path.exists(self.config.manifest_path):
+            # only the manifest: the files it lists change before it does
+            return (os.stat(self.config.manifest_path).st_mtime_ns,)
+        return tuple(os.stat(path).st_mtime_ns for path in self._artifact_files())
+
+    def _version(self, manifest) -> str:
+        if manifest is not None:
+            return manifest["version"]
+        digest = hashlib.sha256()
+        for path in self._artifact_files():
+            digest.update(file_digest(path).encode())
+        return digest.hexdigest()[:16]
+
+    def _check_manifest(self, manifest):
+        # files still mid-way through a training run don't match the manifest yet
+        for path in self._artifact_files():
+            expected = manifest["files"].get(os.path.basename(path))
+            if expected is None or file_digest(path) != expected:
+                raise ValueError(
+                    f"{path} does not match {self.config.manifest_path}; "
+                    "artifacts are being replaced or a training run did not finish"
+                )
+
+    def load(self) -> ModelArtifacts:
+        try:
+            with self._reload_lock:
+                mtimes = self._stat_mtimes()
+                manifest = self._read_manifest()
+                version = self._version(manifest)
+
+                if self._artifacts is not None and self._artifacts.version == version:
+                    # touched but unchanged content, nothing to reload
+                    self._mtimes = mtimes
+                    return self._artifacts
+
+                logging.info(f"Loading model artifacts (version {version})")
+
+                with stage("artifact_load"):
+                    if manifest is not None:
+                        self._check_manifest(manifest)
+                    if self._use_native():
+                        model, preprocessor = load_native_artifacts(self.config.native_dir)
+                    else:
+                        model = load_object(file_path=self.config.model_path)
+                        preprocessor = load_object(file_path=self.config.preprocessor_path)
+                    if self.config.model_threads > 0:
+                        limit_model_threads(model, self.config.model_threads)
+                    if manifest is not None:
+                        # nothing was swapped while the files were being read
+                        self._check_manifest(manifest)
+
+                    self._artifacts = ModelArtifacts(
+                        model=model,
+                        preprocessor=preprocessor,
+                        version=version,
+                        loaded_at=time.time(),
+                        compiled_preprocessor=compile_preprocessor(preprocessor),
+                    )
+                self._mtimes = mtimes
+
+                logging.info(f"Model artifacts loaded (version {version})")
+                return self._artifacts
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def get(self) -> ModelArtifacts:
+        artifacts = self._artifacts
+        if artifacts is None:
+            return self.load()
+
+        now = time.monotonic()
+        if now - self._last_check < self.config.check_interval:
+            return artifacts
+        self._last_check = now
+
+        try:
+            changed = self._stat_mtimes() != self._mtimes
+        except OSError:
+            # artifact is being replaced right now, keep serving the current one
+            return artifacts
+
+        if changed and not self._reload_lock.locked():
+            threading.Thread(target=self._reload_in_background, daemon=True).start()
+
+        return artifacts
+
+    def _reload_in_background(self):
+        try:
+            self.load()
+        except Exception as e:
+            logging.error(f"Model reload failed, keeping previous artifacts: {e}")
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._artifacts.version if self._artifacts is not None else None
+
+
+_default_registry: Optional[ModelRegistry] = None
+_default_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    global _default_registry
+    if _default_registry is None:
+        with _default_registry_lock:
+            if _default_registry is None:
+                _default_registry = ModelRegistry()
+    return _default_registry
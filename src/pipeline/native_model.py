@@ -0,0 +1,134 @@
+import os
+import sys
+import json
+
+import numpy as np
+
+from src.logger import logging
+from src.exeption import CustomException
+from src.utils import atomic_path
+from src.pipeline.fast_path import CompiledPreprocessor
+
+
+NATIVE_MANIFEST = "model_native.json"
+NATIVE_PREPROCESSOR = "preprocessor.npz"
+
+
+def _is_xgboost(model):
+    return type(model).__module__.startswith("xgboost")
+
+
+def export_native_model(model, directory):
+    """
+    Write the model next to model.pkl in a library-native format:
+    XGBoost UBJSON for boosters, raw coefficient arrays for linear models.
+    """
+    try:
+        os.makedirs(directory, exist_ok=True)
+
+        if _is_xgboost(model):
+            file_name = "model.ubj"
+            with atomic_path(os.path.join(directory, file_name)) as tmp_path:
+                model.get_booster().save_model(tmp_path)
+            manifest = {"format": "xgboost", "file": file_name}
+        elif hasattr(model, "coef_") and hasattr(model, "intercept_"):
+            file_name = "model_linear.npz"
+            with atomic_path(os.path.join(directory, file_name)) as tmp_path:
+                np.savez(
+                    tmp_path,
+                    coef=np.asarray(model.coef_, dtype=np.float64),
+                    intercept=np.asarray(model.intercept_, dtype=np.float64)
+                )
+            manifest = {"format": "linear", "file": file_name}
+        else:
+            raise ValueError(f"no native export for {type(model).__name__}")
+
+        with atomic_path(os.path.join(directory, NATIVE_MANIFEST)) as tmp_path:
+            with open(tmp_path, "w") as f:
+                json.dump(manifest, f)
+
+        logging.info(f"native model exported as {manifest['format']} ({file_name})")
+        return os.path.join(directory, file_name)
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def export_native_preprocessor(preprocessor, directory):
+    try:
+        compiled = CompiledPreprocessor.from_preprocessor(preprocessor)
+        file_path = os.path.join(directory, NATIVE_PREPROCESSOR)
+        compiled.save_npz(file_path)
+        logging.info("native preprocessor exported")
+        return file_path
+
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+class NativeModel:
+    """
+    predict_proba() over a native Booster or linear coefficients; no sklearn
+    wrapper, no pickle.
+    """
+
+    def __init__(self, fmt, booster=None, coef=None, intercept=None, iteration_range=(0, 0)):
+        self.format = fmt
+        self.booster = booster
+        self.coef = coef
+        self.intercept = intercept
+        self.iteration_range = iteration_range
+
+    @classmethod
+    def load(cls, directory):
+        with open(os.path.join(directory, NATIVE_MANIFEST)) as f:
+            manifest = json.load(f)
+        file_path = os.path.join(directory, manifest["file"])
+
+        if manifest["format"] == "xgboost":
+            import xgboost as xgb
+
+            booster = xgb.Booster()
+            booster.load_model(file_path)
+            # the sklearn wrapper predicts up to the early-stopping round, match it
+            best_iteration = booster.attr("best_iteration")
+            iteration_range = (0, int(best_iteration) + 1) if best_iteration is not None else (0, 0)
+            return cls("xgboost", booster=booster, iteration_range=iteration_range)
+
+        with np.load(file_path, allow_pickle=False) as data:
+            return cls("linear", coef=data["coef"], intercept=data["intercept"])
+
+    def predict_proba(self, X):
+        if self.format == "xgboost":
+            positive = self.booster.inplace_predict(X, iteration_range=self.iteration_range)
+        else:
+            from scipy.special import expit
+
+            # same arithmetic as LogisticRegression.predict_proba for two classes
+            positive = expit((X @ self.coef.T + self.intercept).ravel())
+        positive = np.asarray(positive).reshape(-1)
+        return np.column_stack([1.0 - positive, positive])
+
+
+def limit_model_threads(model, n_threads):
+    # sklearn XGBoost wrapper via n_jobs, a native Booster via nthread;
+    # without this each model uses every core
+    if isinstance(model, NativeModel):
+        if model.booster is not None:
+            model.booster.set_param({"nthread": n_threads})
+    elif hasattr(model, "set_params") and "n_jobs" in model.get_params():
+        model.set_params(n_jobs=n_threads)
+
+
+def native_artifacts_exist(directory):
+    return (
+        os.path.exists(os.path.join(directory, NATIVE_MANIFEST))
+        and os.path.exists(os.path.join(directory, NATIVE_PREPROCESSOR))
+    )
+
+
+def load_native_artifacts(directory):
+    return (
+        NativeModel.load(directory),
+        CompiledPreprocessor.load_npz(os.path.join(directory, NATIVE_PREPROCESSOR))
+    )
@@ -1,56 +1,60 @@
-import os
 import sys
 import pandas as pd
 import numpy as np
 
-from src.utils import load_object
-from src.logger import logging
+from src.logger import logging, PER_REQUEST
 from src.exeption import CustomException
+from src.pipeline.model_registry import ModelRegistry, get_model_registry
+from src.pipeline.fast_path import RISK_BINS, RISK_LABELS, risk_level_for
+from src.pipeline.prediction_cache import PredictionCache, get_prediction_cache
+from src.metrics import ROWS_SCORED, stage
 
 
+# cache argument not given: use the shared cache; an explicit None disables caching
+_SHARED_CACHE = object()
+
 
 class PredictPipeline:
-    def __init__(self):
-        pass
+    def __init__(self, registry: ModelRegistry = None, cache: PredictionCache = _SHARED_CACHE):
+        self.registry = registry or get_model_registry()
+        # record-level scores only; whole-frame predict() is cheaper to rerun than to hash
+        self.cache = get_prediction_cache() if cache is _SHARED_CACHE else cache
 
     def predict(self, features: pd.DataFrame):
         try:
-            logging.info("Starting prediction pipeline")
-
-           
-            project_root = os.path.dirname(
-                os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            )
+            logging.info("Starting prediction pipeline", extra=PER_REQUEST)
 
-            model_path = os.path.join(project_root, "artifacts", "model.pkl")
-            preprocessor_path = os.path.join(project_root, "artifacts", "preprocessor.pkl")
-
-            
-            model = load_object(file_path=model_path)
-            preprocessor = load_object(file_path=preprocessor_path)
+            # resident artifacts; a hot reload never swaps them mid-request
+            artifacts = self.registry.get()
+            model = artifacts.model
+            preprocessor = artifacts.preprocessor
 
             
             if not isinstance(features, pd.DataFrame):
                 raise CustomException("Input features must be a pandas DataFrame")
 
             
-            data_scaled = preprocessor.transform(features)
+            with stage("transform"):
+                data_scaled = preprocessor.transform(features)
 
            
-            churn_prob = model.predict_proba(data_scaled)[:, 1]
+            with stage("predict_proba"):
+                churn_prob = model.predict_proba(data_scaled)[:, 1]
 
             
-            risk_bucket = pd.cut(
-                churn_prob,
-                bins=[0.0, 0.4, 0.7, 1.0],
-                labels=["Low", "Medium", "High"]
-            )
+            with stage("risk_bucketing"):
+                risk_bucket = pd.cut(
+                    churn_prob,
+                    bins=list(RISK_BINS),
+                    labels=list(RISK_LABELS)
+                )
+            ROWS_SCORED.inc(len(features), path="frame")
 
             result = features.copy()
             result["churn_probability"] = churn_prob
             result["risk_level"] = risk_bucket
 
-            logging.info("Prediction pipeline completed successfully")
+            logging.info("Prediction pipeline completed successfully", extra=PER_REQUEST)
 
             return result
 
@@ -58,6 +62,111 @@ class PredictPipeline:
             logging.error("Exception occurred in prediction pipeline")
             raise CustomException(e, sys)
 
+    def predict_chunks(self, chunks):
+        # chunks: any iterable of DataFrames, e.g. pd.read_csv(..., chunksize=n)
+        for chunk in chunks:
+            yield self.predict(chunk)
+
+    def predict_record(self, record: dict):
+        # single customer: skip DataFrame construction when the preprocessor compiles
+        try:
+            artifacts = self.registry.get()
+
+            if self.cache is not None:
+                self.cache.sync_version(artifacts.version)
+                key = self.cache.make_key(record, artifacts.version)
+                cached = self.cache.get_many([key]).get(key)
+                if cached is not None:
+                    churn_prob, risk_level = cached
+                    return {
+                        "customer_id": record["customer_id"],
+                        "churn_probability": churn_prob,
+                        "risk_level": risk_level
+                    }
+
+            compiled = artifacts.compiled_preprocessor
+
+            if compiled is None:
+                with stage("dataframe"):
+                    df = pd.DataFrame([record])
+                row = self.predict(df).iloc[0]
+                churn_prob, risk_level = row["churn_probability"], row["risk_level"]
+            else:
+                with stage("transform"):
+                    features = compiled.transform_record(record)
+                with stage("predict_proba"):
+                    churn_prob = artifacts.model.predict_proba(features)[0, 1]
+                with stage("risk_bucketing"):
+                    risk_level = risk_level_for(churn_prob)
+                ROWS_SCORED.inc(1, path="record")
+
+            if self.cache is not None:
+                self.cache.put_many([(key, (churn_prob, risk_level))], artifacts.version)
+
+            return {
+                "customer_id": record["customer_id"],
+                "churn_probability": churn_prob,
+                "risk_level": risk_level
+            }
+
+        except Exception as e:
+            logging.error("Exception occurred in single record prediction")
+            raise CustomException(e, sys)
+
+    def predict_records(self, records: list):
+        # many single customers at once: one feature matrix, one predict_proba call
+        try:
+            artifacts = self.registry.get()
+
+            if self.cache is None:
+                scores = self._score_records(artifacts, records)
+            else:
+                # only the rows the cache can't answer go to the model
+                self.cache.sync_version(artifacts.version)
+                keys = [self.cache.make_key(record, artifacts.version) for record in records]
+                found = self.cache.get_many(keys)
+                missing = [i for i, key in enumerate(keys) if key not in found]
+
+                if missing:
+                    fresh = self._score_records(artifacts, [records[i] for i in missing])
+                    fresh_items = [(keys[i], score) for i, score in zip(missing, fresh)]
+                    self.cache.put_many(fresh_items, artifacts.version)
+                    found.update(fresh_items)
+                scores = [found[key] for key in keys]
+
+            return [
+                {
+                    "customer_id": record["customer_id"],
+                    "churn_probability": churn_prob,
+                    "risk_level": risk_level
+                }
+                for record, (churn_prob, risk_level) in zip(records, scores)
+            ]
+
+        except Exception as e:
+            logging.error("Exception occurred in batch record prediction")
+            raise CustomException(e, sys)
+
+    def _score_records(self, artifacts, records):
+        compiled = artifacts.compiled_preprocessor
+
+        if compiled is None:
+            with stage("dataframe"):
+                df = pd.DataFrame(records)
+            predictions = self.predict(df)
+            churn_probs = predictions["churn_probability"].to_numpy()
+            risk_levels = predictions["risk_level"].tolist()
+        else:
+            with stage("transform"):
+                features = compiled.transform_records(records)
+            with stage("predict_proba"):
+                churn_probs = artifacts.model.predict_proba(features)[:, 1]
+            with stage("risk_bucketing"):
+                risk_levels = [risk_level_for(p) for p in churn_probs]
+            ROWS_SCORED.inc(len(records), path="records")
+
+        return list(zip(churn_probs, risk_levels))
+
 
 class CustomData:
     def __init__(
@@ -0,0 +1,227 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from src.logger import logging
+from src.exeption import CustomException
+
+
+@dataclass
+class PredictionCacheConfig:
+    enabled: bool = os.getenv("PREDICTION_CACHE", "1") == "1"
+    max_entries: int = int(os.getenv("PREDICTION_CACHE_SIZE", "100000"))
+    # 0 disables expiry; entries still die with the model version
+    ttl_seconds: float = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+    # optional SQLite file shared by every worker process on the host
+    disk_path: Optional[str] = os.getenv("PREDICTION_CACHE_PATH") or None
+
+
+class _DiskCache:
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "key TEXT PRIMARY KEY, version TEXT NOT NULL, "
+                "churn_probability REAL NOT NULL, dtype TEXT NOT NULL, "
+                "risk_level TEXT, created_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys, min_created_at):
+        found = {}
+        conn = self._connect()
+        # stay well under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            part = keys[start:start + 500]
+            rows = conn.execute(
+                "SELECT key, churn_probability, dtype, risk_level FROM predictions "
+                f"WHERE key IN ({','.join('?' * len(part))}) AND created_at >= ?",
+                (*part, min_created_at)
+            )
+            for key, prob, dtype, risk_level in rows:
+                # REAL round-trips float32 exactly, restore the model's scalar type
+                found[key] = (np.dtype(dtype).type(prob), risk_level)
+        return found
+
+    def put_many(self, version, items, created_at):
+        conn = self._connect()
+        conn.executemany(
+            "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (key, version, float(prob), np.asarray(prob).dtype.name, risk_level, created_at)
+                for key, (prob, risk_level) in items
+            ]
+        )
+
+    def drop_other_versions(self, version):
+        self._connect().execute("DELETE FROM predictions WHERE version != ?", (version,))
+
+    def clear(self):
+        self._connect().execute("DELETE FROM predictions")
+
+
+class PredictionCache:
+    """
+    LRU/TTL cache of single-customer scores, optionally backed by SQLite.
+
+    Keys hash every feature value of the record together with the model
+    version, so a changed feature or a reloaded model is always a miss.
+    Values are (churn_probability, risk_level); customer_id comes from the
+    caller's record.
+    """
+
+    def __init__(self, config: PredictionCacheConfig = None):
+        self.config = config or PredictionCacheConfig()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._disk = _DiskCache(self.config.disk_path) if self.config.disk_path else None
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(record, version):
+        canonical = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.blake2b(f"{version}|{canonical}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def sync_version(self, version):
+        # first lookup after a model reload drops everything scored by the old model
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            if self._version is not None:
+                self.invalidations += 1
+                logging.info(f"prediction cache cleared for model version {version}")
+            self._entries.clear()
+            self._version = version
+        if self._disk is not None:
+            try:
+                self._disk.drop_other_versions(version)
+            except sqlite3.Error as e:
+                # old rows can't be hit anyway, their keys carry the old version
+                logging.warning(f"prediction cache disk sweep failed: {e}")
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at and expires_at < now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+
+        if self._disk is not None:
+            missing = [key for key in keys if key not in found]
+            if missing:
+                min_created_at = time.time() - self.config.ttl_seconds if self.config.ttl_seconds else 0.0
+                try:
+                    from_disk = self._disk.get_many(missing, min_created_at)
+                except sqlite3.Error as e:
+                    # same as put_many: score the records rather than fail
+                    logging.warning(f"prediction cache disk read failed: {e}")
+                    from_disk = {}
+                if from_disk:
+                    self._remember(from_disk.items())
+                    found.update(from_disk)
+                    with self._lock:
+                        self.disk_hits += len(from_disk)
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items, version):
+        items = list(items)
+        self._remember(items)
+        if self._disk is not None:
+            try:
+                self._disk.put_many(version, items, time.time())
+            except sqlite3.Error as e:
+                # a locked or full disk cache must never fail a prediction
+                logging.warning(f"prediction cache disk write failed: {e}")
+
+    def _remember(self, items):
+        expires_at = time.monotonic() + self.config.ttl_seconds if self.config.ttl_seconds else 0.0
+        with self._lock:
+            for key, value in items:
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.config.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        try:
+            with self._lock:
+                self._entries.clear()
+            if self._disk is not None:
+                self._disk.clear()
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.config.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.config.max_entries,
+            "ttl_seconds": self.config.ttl_seconds,
+            "disk_path": self.config.disk_path,
+            "model_version": self._version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+
+_default_cache: Optional[PredictionCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_prediction_cache() -> Optional[PredictionCache]:
+    # None when PREDICTION_CACHE=0
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                config = PredictionCacheConfig()
+                if not config.enabled:
+                    return None
+                _default_cache = PredictionCache(config)
+    return _default_cache
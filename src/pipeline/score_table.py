@@ -0,0 +1,230 @@
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.logger import logging
+from src.exeption import CustomException
+from src.analytics.kpi import ChurnKPIAccumulator
+from src.pipeline.predict_pipeline import PredictPipeline
+
+
+@dataclass
+class ScoreTableConfig:
+    path: str = os.getenv("SCORE_TABLE_PATH", os.path.join("artifacts", "score_table.sqlite"))
+    chunksize: int = 100_000
+    target_column: str = "churn"
+    # how often (seconds) readers check whether the table file was rebuilt
+    check_interval: float = float(os.getenv("SCORE_TABLE_CHECK_INTERVAL", "5"))
+
+
+def feature_hash(df: pd.DataFrame, columns) -> np.ndarray:
+    # numbers as float64 and the rest as str, so a CSV-typed frame and a
+    # JSON-typed record with the same values hash the same
+    normalized = pd.DataFrame({
+        column: (
+            df[column].astype("float64")
+            if pd.api.types.is_numeric_dtype(df[column])
+            else df[column].astype(str)
+        )
+        for column in columns
+    })
+    # SQLite integers are signed 64-bit
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy().view(np.int64)
+
+
+class ScoreTable:
+    """
+    Precomputed churn scores for the known customer base, in a SQLite file
+    keyed on customer_id.
+
+    A row is only served while it belongs to the loaded model version; a
+    feature hash lets callers that send the record check it still matches.
+    """
+
+    def __init__(self, config: ScoreTableConfig = None):
+        self.config = config or ScoreTableConfig()
+        self._conn = None
+        self._meta = None
+        self._identity = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def build(self, input_path: str, pipeline: PredictPipeline = None):
+        try:
+            pipeline = pipeline or PredictPipeline()
+            version = pipeline.registry.get().version
+            logging.info(f"Building score table from {input_path} for model {version}")
+            start_time = time.perf_counter()
+
+            tmp_path = self.config.path + ".tmp"
+            os.makedirs(os.path.dirname(os.path.abspath(tmp_path)), exist_ok=True)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+            conn = sqlite3.connect(tmp_path)
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE scores ("
+                "customer_id INTEGER PRIMARY KEY, churn_probability REAL NOT NULL, "
+                "risk_level TEXT, feature_hash INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+
+            kpi = ChurnKPIAccumulator()
+            feature_columns = None
+            dtype = None
+            reader = pd.read_csv(input_path, chunksize=self.config.chunksize)
+
+            for chunk in reader:
+                chunk = chunk.drop(columns=[self.config.target_column], errors="ignore")
+                if feature_columns is None:
+                    feature_columns = [c for c in chunk.columns if c != "customer_id"]
+
+                predictions = pipeline.predict(chunk)
+                kpi.update(predictions)
+                dtype = predictions["churn_probability"].dtype.name
+
+                conn.executemany(
+                    "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?)",
+                    zip(
+                        predictions["customer_id"].astype("int64").tolist(),
+                        predictions["churn_probability"].astype("float64").tolist(),
+                        predictions["risk_level"].astype(object).where(
+                            predictions["risk_level"].notna(), None
+                        ).tolist(),
+                        feature_hash(chunk, feature_columns).tolist()
+                    )
+                )
+
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ("model_version", version),
+                ("feature_columns", ",".join(feature_columns or [])),
+                ("probability_dtype", dtype or "float64"),
+                ("built_at", str(time.time())),
+            ])
+            conn.commit()
+            conn.close()
+
+            # readers holding the old file keep it until they notice the swap
+            os.replace(tmp_path, self.config.path)
+
+            results = kpi.compute_kpis()
+            logging.info(
+                f"Score table built: {results['total_customers']} rows in "
+                f"{time.perf_counter() - start_time:.1f}s"
+            )
+            return results
+
+        except Exception as e:
+            logging.error("Exception occurred while building the score table")
+            raise CustomException(e, sys)
+
+    def _connection(self):
+        now = time.monotonic()
+        if self._conn is not None and now - self._checked_at < self.config.check_interval:
+            return self._conn
+        self._checked_at = now
+
+        try:
+            stat = os.stat(self.config.path)
+        except FileNotFoundError:
+            self._close()
+            return None
+
+        identity = (stat.st_ino, stat.st_mtime_ns)
+        if self._conn is None or identity != self._identity:
+            self._close()
+            conn = sqlite3.connect(
+                f"file:{os.path.abspath(self.config.path)}?mode=ro",
+                uri=True, check_same_thread=False
+            )
+            self._meta = dict(conn.execute("SELECT key, value FROM meta"))
+            self._meta["feature_columns"] = [
+                c for c in self._meta["feature_columns"].split(",") if c
+            ]
+            self._conn = conn
+            self._identity = identity
+            logging.info(f"score table opened for model {self._meta['model_version']}")
+        return self._conn
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = None
+        self._meta = None
+        self._identity = None
+
+    def lookup(self, customer_id: int, model_version: str, record: Optional[dict] = None):
+        """
+        Returns (churn_probability, risk_level), or None when the customer is
+        missing, the table was built by another model, or the record's
+        features no longer match the ones that were scored.
+        """
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                self.misses += 1
+                return None
+            if self._meta["model_version"] != model_version:
+                self.stale += 1
+                return None
+
+            row = conn.execute(
+                "SELECT churn_probability, risk_level, feature_hash FROM scores WHERE customer_id = ?",
+                (customer_id,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            churn_prob, risk_level, stored_hash = row
+            if record is not None:
+                columns = self._meta["feature_columns"]
+                current = feature_hash(pd.DataFrame([record], columns=columns), columns)[0]
+                if current != stored_hash:
+                    self.stale += 1
+                    return None
+
+            self.hits += 1
+            return np.dtype(self._meta["probability_dtype"]).type(churn_prob), risk_level
+
+    def stats(self):
+        with self._lock:
+            conn = self._connection()
+            return {
+                "path": self.config.path,
+                "available": conn is not None,
+                "model_version": self._meta["model_version"] if conn is not None else None,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale
+            }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute churn scores for every known customer")
+    parser.add_argument("input_path")
+    parser.add_argument("--output", default=ScoreTableConfig.path)
+    parser.add_argument("--chunksize", type=int, default=ScoreTableConfig.chunksize)
+    args = parser.parse_args()
+
+    results = ScoreTable(ScoreTableConfig(path=args.output, chunksize=args.chunksize)).build(args.input_path)
+
+    print("\n===== SCORE TABLE =====")
+    print("Table:", args.output)
+    print("Total customers:", results["total_customers"])
+    print("High risk customers:", results["high_risk_customers"])
+    print("Average churn probability:", results["average_churn_probability"])
@@ -1,22 +1,200 @@
 import os
 import sys
+import hashlib
+from contextlib import contextmanager
 import pandas as pd
 import numpy as np
 from src.exeption import CustomException
-from sklearn.metrics import r2_score, roc_auc_score
-from sklearn.model_selection import GridSearchCV
+from src.logger import logging
+
+@contextmanager
+def atomic_path(file_path):
+    # write to a sibling temp file, then rename it over the target in one step,
+    # so readers see the old file or the new one and never a partial write;
+    # the extension is kept for writers that pick a format from it
+    dir_path = os.path.dirname(file_path) or "."
+    os.makedirs(dir_path, exist_ok=True)
+    root, ext = os.path.splitext(os.path.basename(file_path))
+    tmp_path = os.path.join(dir_path, f".{root}.{os.getpid()}.tmp{ext}")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
 def save_object(file_path, obj):
     try:
-        dir_path = os.path.dirname(file_path)
-        os.makedirs(dir_path, exist_ok=True)
-        pd.to_pickle(obj, file_path)
+        with atomic_path(file_path) as tmp_path:
+            pd.to_pickle(obj, tmp_path)
     except Exception as e:
         raise CustomException(f"Error saving object: {e}", sys)
 
+def file_digest(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
 def load_object(file_path):
     try:
         obj = pd.read_pickle(file_path)
         return obj
     except Exception as e:
-        raise CustomException(f"Error loading object: {e}", sys)
\ No newline at end of file
+        raise CustomException(f"Error loading object: {e}", sys)
+
+
+ARTIFACT_FORMATS = {
+    "csv": ".csv",
+    "parquet": ".parquet",
+    "feather": ".feather",
+}
+
+
+def resolve_artifact_format(fmt):
+    fmt = (fmt or "csv").lower()
+    if fmt not in ARTIFACT_FORMATS:
+        raise CustomException(f"Unknown artifact format: {fmt}", sys)
+    if fmt != "csv":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            logging.warning(f"pyarrow is not installed, writing csv instead of {fmt}")
+            return "csv"
+    return fmt
+
+
+def artifact_path(file_path, fmt):
+    root, _ = os.path.splitext(file_path)
+    return root + ARTIFACT_FORMATS[fmt]
+
+
+def _artifact_format_of(file_path):
+    ext = os.path.splitext(file_path)[1].lower()
+    for fmt, fmt_ext in ARTIFACT_FORMATS.items():
+        if ext == fmt_ext:
+            return fmt
+    return "csv"
+
+
+def save_dataframe(df, file_path):
+    try:
+        dir_path = os.path.dirname(file_path)
+        os.makedirs(dir_path, exist_ok=True)
+        fmt = _artifact_format_of(file_path)
+
+        if fmt == "csv":
+            df.to_csv(file_path, index=False, header=True)
+            return file_path
+
+        # typed formats: keep low-cardinality strings (subscription_plan, ...) as category
+        text_cols = df.select_dtypes(include=["object", "string"]).columns
+        if len(text_cols):
+            df = df.astype({col: "category" for col in text_cols})
+
+        if fmt == "parquet":
+            df.to_parquet(file_path, index=False)
+        else:
+            # uncompressed feather can be memory-mapped without decoding
+            df.to_feather(file_path, compression="uncompressed")
+        return file_path
+
+    except Exception as e:
+        raise CustomException(f"Error saving dataframe: {e}", sys)
+
+
+def load_dataframe(file_path, columns=None):
+    try:
+        fmt = _artifact_format_of(file_path)
+
+        if fmt == "csv":
+            return pd.read_csv(file_path, usecols=columns)
+
+        if fmt == "parquet":
+            return pd.read_parquet(file_path, columns=columns, memory_map=True)
+
+        from pyarrow import feather
+        table = feather.read_table(file_path, columns=columns, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+    except Exception as e:
+        raise CustomException(f"Error loading dataframe: {e}", sys)
+
+
+class DataFrameChunkWriter:
+    """
+    Appends DataFrame chunks to one csv/parquet/feather artifact, so a
+    stage can write its output without holding all of it in memory.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.fmt = _artifact_format_of(file_path)
+        self.rows_written = 0
+        self._schema = None
+        self._writer = None
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+
+    def write(self, df):
+        try:
+            if self.fmt == "csv":
+                df.to_csv(
+                    self.file_path,
+                    mode="w" if self._schema is None else "a",
+                    header=self._schema is None,
+                    index=False
+                )
+                self._schema = True
+            else:
+                self._write_arrow(df)
+            self.rows_written += len(df)
+
+        except Exception as e:
+            raise CustomException(f"Error writing dataframe chunk: {e}", sys)
+
+    def _write_arrow(self, df):
+        import pyarrow as pa
+
+        if self._schema is None:
+            text_cols = df.select_dtypes(include=["object", "string"]).columns
+            table = pa.Table.from_pandas(
+                df.astype({col: "category" for col in text_cols}), preserve_index=False
+            )
+            schema = table.schema
+            if self.fmt == "feather":
+                # IPC files allow one dictionary per field, and chunks see different
+                # categories, so streamed feather keeps strings undictionaried
+                schema = pa.schema(
+                    [
+                        pa.field(f.name, f.type.value_type)
+                        if pa.types.is_dictionary(f.type) else f
+                        for f in schema
+                    ],
+                    metadata=schema.metadata
+                )
+            self._schema = schema
+            self._writer = self._open_arrow_writer(schema)
+
+        table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def _open_arrow_writer(self, schema):
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(self.file_path, schema)
+
+        import pyarrow.ipc as ipc
+        return ipc.new_file(self.file_path, schema)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        return self.file_path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,174 @@
+import itertools
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.pipeline.batch_store import BatchNotReady, BatchStore, BatchStoreConfig
+from src.pipeline.fast_path import risk_level_for
+
+
+@pytest.fixture(scope="module")
+def scored():
+    rng = np.random.default_rng(0)
+    # rounded so ties are common
+    churn_prob = np.round(rng.random(500), 2)
+    return pd.DataFrame({
+        "customer_id": np.arange(1000, 1500),
+        "churn_probability": churn_prob,
+        "risk_level": [risk_level_for(p) for p in churn_prob]
+    })
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory, scored):
+    store = BatchStore(BatchStoreConfig(root=str(tmp_path_factory.mktemp("batches"))))
+    batch_id = store.create("test")["batch_id"]
+    for index, start in enumerate(range(0, len(scored), 120)):
+        store.add_chunk(batch_id, index, scored.iloc[start:start + 120])
+    store.seal(batch_id)
+    return store, batch_id
+
+
+def expected_page(scored, sort, descending, risk_level, min_probability, max_probability, offset, limit):
+    rows = scored
+    if risk_level is not None:
+        rows = rows[rows["risk_level"] == risk_level]
+    if min_probability is not None:
+        rows = rows[rows["churn_probability"] >= min_probability]
+    if max_probability is not None:
+        rows = rows[rows["churn_probability"] <= max_probability]
+
+    if sort == "churn_probability":
+        # descending keeps file order among ties; ascending is its reverse
+        rows = rows.sort_values("churn_probability", ascending=False, kind="stable")
+        if not descending:
+            rows = rows.iloc[::-1]
+    elif descending:
+        rows = rows.iloc[::-1]
+    return len(rows), rows.iloc[offset:offset + limit]
+
+
+@pytest.mark.parametrize(
+    "sort, descending, risk_level, probability_range",
+    list(itertools.product(
+        ["churn_probability", "row"],
+        [True, False],
+        [None, "Low", "Medium", "High"],
+        [(None, None), (0.3, None), (None, 0.75), (0.5, 0.5)],
+    ))
+)
+def test_query_matches_pandas(store, scored, sort, descending, risk_level, probability_range):
+    store, batch_id = store
+    min_probability, max_probability = probability_range
+    for offset, limit in [(0, 25), (40, 60), (490, 100), (0, 0)]:
+        total, page = store.query(
+            batch_id, offset=offset, limit=limit, sort=sort, descending=descending,
+            risk_level=risk_level, min_probability=min_probability, max_probability=max_probability
+        )
+        expected_total, expected = expected_page(
+            scored, sort, descending, risk_level, min_probability, max_probability, offset, limit
+        )
+        assert total == expected_total
+        assert page["customer_id"].tolist() == expected["customer_id"].tolist()
+        assert page["churn_probability"].tolist() == expected["churn_probability"].tolist()
+        assert page["risk_level"].tolist() == expected["risk_level"].tolist()
+
+
+def test_iter_frames_is_file_order(store, scored):
+    store, batch_id = store
+    whole = pd.concat(store.iter_frames(batch_id, chunksize=64), ignore_index=True)
+    assert whole["customer_id"].tolist() == scored["customer_id"].tolist()
+
+    high = pd.concat(store.iter_frames(batch_id, risk_level="High", chunksize=64), ignore_index=True)
+    assert high["customer_id"].tolist() == scored.loc[scored["risk_level"] == "High", "customer_id"].tolist()
+
+
+def test_sealed_batch_refuses_chunks(tmp_path, scored):
+    store = BatchStore(BatchStoreConfig(root=str(tmp_path)))
+    batch_id = store.create("test")["batch_id"]
+    store.add_chunk(batch_id, 0, scored.iloc[:10])
+    assert store.seal(batch_id)["rows"] == 10
+    with pytest.raises(BatchNotReady):
+        store.add_chunk(batch_id, 1, scored.iloc[10:20])
+    # sealing again is a no-op
+    assert store.seal(batch_id)["rows"] == 10
+
+
+def test_accepted_chunks_survive_a_concurrent_seal(tmp_path, scored):
+    store = BatchStore(BatchStoreConfig(root=str(tmp_path)))
+    for _ in range(5):
+        batch_id = store.create("test")["batch_id"]
+        accepted = []
+        start = threading.Barrier(9)
+
+        def upload(index):
+            start.wait()
+            try:
+                store.add_chunk(batch_id, index, scored.iloc[index * 10:index * 10 + 10])
+                accepted.append(index)
+            except BatchNotReady:
+                pass
+
+        threads = [threading.Thread(target=upload, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        meta = store.seal(batch_id)
+        for thread in threads:
+            thread.join()
+
+        assert meta["chunks"] == len(accepted)
+        assert meta["rows"] == 10 * len(accepted)
+
+
+def test_prune_counts_job_batches_apart(tmp_path, scored):
+    store = BatchStore(BatchStoreConfig(root=str(tmp_path), max_batches=2, max_job_batches=1))
+    sealed = []
+    for job_id in [None, None, "job-1", None, "job-2"]:
+        batch_id = store.create("test", job_id=job_id)["batch_id"]
+        store.add_chunk(batch_id, 0, scored.iloc[:5])
+        store.seal(batch_id)
+        sealed.append(batch_id)
+        # created_at orders the batches
+        time.sleep(0.01)
+
+    kept = {meta["batch_id"] for meta in store.list()}
+    assert kept == {sealed[1], sealed[3], sealed[4]}
+
+
+def test_idle_open_batches_expire(tmp_path):
+    store = BatchStore(BatchStoreConfig(root=str(tmp_path), open_ttl_seconds=60))
+    idle = store.create("test")["batch_id"]
+    meta = store.get(idle)
+    meta["created_at"] -= 120
+    store._write_meta(idle, meta)
+    past = time.time() - 120
+    os.utime(store._path(idle, "chunks"), (past, past))
+
+    fresh = store.create("test")["batch_id"]
+    assert [meta["batch_id"] for meta in store.list()] == [fresh]
+
+
+def test_api_refuses_writes_to_job_batches(tmp_path, monkeypatch):
+    import api.main
+
+    store = BatchStore(BatchStoreConfig(root=str(tmp_path)))
+    monkeypatch.setattr(api.main, "batch_store", store)
+    client = TestClient(api.main.app)
+
+    batch_id = store.create("test", job_id="job-1")["batch_id"]
+    body = open(os.path.join("Notebook", "data", "test.csv"), "rb").read()
+    response = client.put(f"/batches/{batch_id}/chunks/0", content=body, headers={"Content-Type": "text/csv"})
+    assert response.status_code == 409
+    assert client.post(f"/batches/{batch_id}/seal").status_code == 409
+    assert store.get(batch_id)["status"] == "open"
+
+    batch_id = client.post("/batches").json()["batch_id"]
+    sealed = client.post(f"/batches/{batch_id}/seal").json()
+    assert sealed["status"] == "sealed"
+    assert sealed["kpis"]["average_churn_probability"] is None
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api.batching import MicroBatcher, MicroBatcherConfig
+from api.executor import Overloaded
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_each_caller_gets_its_own_result():
+    sizes = []
+
+    def double(items):
+        sizes.append(len(items))
+        return [item * 2 for item in items]
+
+    async def main():
+        batcher = MicroBatcher(double, MicroBatcherConfig(max_batch_size=8, max_wait_ms=20))
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(50))), batcher.stats()
+        finally:
+            await batcher.stop()
+
+    results, stats = run(main())
+    assert results == [i * 2 for i in range(50)]
+    assert max(sizes) <= 8
+    assert sum(sizes) == 50
+    assert stats["rows"] == 50
+    assert stats["batches"] == len(sizes)
+
+
+def test_failed_batch_fails_its_callers_only():
+    def score(items):
+        if "bad" in items:
+            raise ValueError("bad row")
+        return [item.upper() for item in items]
+
+    async def main():
+        batcher = MicroBatcher(score, MicroBatcherConfig(max_batch_size=2, max_wait_ms=50))
+        try:
+            failed = await asyncio.gather(
+                batcher.submit("a"), batcher.submit("bad"), return_exceptions=True
+            )
+            recovered = await asyncio.gather(batcher.submit("c"), batcher.submit("d"))
+            return failed, recovered
+        finally:
+            await batcher.stop()
+
+    failed, recovered = run(main())
+    assert all(isinstance(result, ValueError) for result in failed)
+    assert recovered == ["C", "D"]
+
+
+def test_full_queue_is_refused():
+    async def main():
+        batcher = MicroBatcher(lambda items: items, MicroBatcherConfig(max_queued=0))
+        try:
+            with pytest.raises(Overloaded):
+                await batcher.submit(1)
+        finally:
+            await batcher.stop()
+
+    run(main())
+
+
+def test_batches_are_scored_concurrently():
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow(items):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return items
+
+    async def main():
+        executor = ThreadPoolExecutor(max_workers=4)
+        batcher = MicroBatcher(
+            slow, MicroBatcherConfig(max_batch_size=2, max_wait_ms=1, max_in_flight=4), executor=executor
+        )
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(16)))
+        finally:
+            await batcher.stop()
+            executor.shutdown()
+
+    assert run(main()) == list(range(16))
+    assert 1 < peak <= 4
+
+
+def test_stop_fails_waiting_callers():
+    release = threading.Event()
+
+    def blocked(items):
+        release.wait(5)
+        return items
+
+    async def main():
+        batcher = MicroBatcher(blocked, MicroBatcherConfig(max_batch_size=1, max_wait_ms=1, max_in_flight=1))
+        waiting = [asyncio.ensure_future(batcher.submit(i)) for i in range(3)]
+        await asyncio.sleep(0.05)
+        await batcher.stop()
+        release.set()
+        return await asyncio.gather(*waiting, return_exceptions=True)
+
+    results = run(main())
+    assert all(isinstance(result, Overloaded) for result in results)
@@ -0,0 +1,58 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.components.data_ingestion import DataIngestion
+
+
+SOURCE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Notebook", "data", "customer_churn.csv")
+
+
+def streaming_ingestion(directory, chunksize):
+    ingestion = DataIngestion()
+    config = ingestion.ingestion_config
+    config.streaming = True
+    config.artifact_format = "csv"
+    config.chunksize = chunksize
+    config.raw_data_path = os.path.join(directory, "data.csv")
+    config.train_data_path = os.path.join(directory, "train.csv")
+    config.test_data_path = os.path.join(directory, "test.csv")
+    train_path, test_path = ingestion.initiate_data_ingestion()
+    return pd.read_csv(train_path), pd.read_csv(test_path)
+
+
+@pytest.fixture(scope="module")
+def source():
+    return pd.read_csv(SOURCE)
+
+
+def test_split_does_not_depend_on_chunk_size(tmp_path, source):
+    splits = [
+        streaming_ingestion(str(tmp_path / str(chunksize)), chunksize)
+        for chunksize in (37, 1000, len(source) + 1)
+    ]
+    first_train, first_test = splits[0]
+    for train, test in splits[1:]:
+        assert train["customer_id"].tolist() == first_train["customer_id"].tolist()
+        assert test["customer_id"].tolist() == first_test["customer_id"].tolist()
+
+
+def test_split_covers_every_row_once(tmp_path, source):
+    train, test = streaming_ingestion(str(tmp_path), 250)
+    assert len(train) + len(test) == len(source)
+    assert set(train["customer_id"]).isdisjoint(test["customer_id"])
+    assert sorted(pd.concat([train, test])["customer_id"]) == sorted(source["customer_id"])
+
+
+def test_split_is_stratified_in_expectation(tmp_path, source):
+    train, test = streaming_ingestion(str(tmp_path), 250)
+    assert len(test) / len(source) == pytest.approx(0.2, abs=0.05)
+    assert test["churn"].mean() == pytest.approx(source["churn"].mean(), abs=0.05)
+
+
+def test_mask_is_a_pure_function_of_the_key_columns(source):
+    ingestion = DataIngestion()
+    whole = ingestion.hash_split_mask(source)
+    shuffled = source.sample(frac=1, random_state=3)
+    assert (ingestion.hash_split_mask(shuffled) == whole[shuffled.index.to_numpy()]).all()
@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import load_object
+from src.pipeline.fast_path import CompiledPreprocessor
+from src.pipeline.model_registry import ModelRegistry, ModelRegistryConfig
+from src.pipeline.predict_pipeline import PredictPipeline
+
+
+ARTIFACTS = os.path.join(os.path.dirname(os.path.dirname(__file__)), "artifacts")
+TEST_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Notebook", "data", "test.csv")
+
+
+def _dense(matrix):
+    return matrix.toarray() if hasattr(matrix, "toarray") else np.asarray(matrix)
+
+
+@pytest.fixture(scope="module")
+def preprocessor():
+    return load_object(os.path.join(ARTIFACTS, "preprocessor.pkl"))
+
+
+@pytest.fixture(scope="module")
+def frame():
+    df = pd.read_csv(TEST_DATA)
+    # missing and unseen values: sklearn imputes NaN but encodes None and
+    # unknown categories as all zeros
+    extra = pd.DataFrame([
+        {**df.iloc[0].to_dict(), "subscription_plan": None},
+        {**df.iloc[0].to_dict(), "subscription_plan": np.nan},
+        {**df.iloc[0].to_dict(), "subscription_plan": "Platinum"},
+        {**df.iloc[1].to_dict(), "monthly_usage": np.nan, "tenure_months": np.nan},
+    ])
+    return pd.concat([df, extra], ignore_index=True)
+
+
+def test_compiled_frame_matches_sklearn(preprocessor, frame):
+    compiled = CompiledPreprocessor.from_preprocessor(preprocessor)
+    np.testing.assert_allclose(compiled.transform(frame), _dense(preprocessor.transform(frame)))
+
+
+def test_compiled_records_match_sklearn(preprocessor, frame):
+    compiled = CompiledPreprocessor.from_preprocessor(preprocessor)
+    records = frame.to_dict(orient="records")
+    expected = _dense(preprocessor.transform(frame))
+    np.testing.assert_allclose(compiled.transform_records(records), expected)
+    for i, record in enumerate(records):
+        np.testing.assert_allclose(compiled.transform_record(record)[0], expected[i])
+
+
+def test_predict_record_matches_predict(frame):
+    registry = ModelRegistry(ModelRegistryConfig(artifact_format="pickle"))
+    pipeline = PredictPipeline(registry=registry, cache=None)
+    assert registry.get().compiled_preprocessor is not None
+
+    expected = pipeline.predict(frame)
+    records = frame.to_dict(orient="records")
+    batched = pipeline.predict_records(records)
+    for i, record in enumerate(records):
+        single = pipeline.predict_record(record)
+        assert single["churn_probability"] == expected["churn_probability"].iloc[i]
+        assert batched[i]["churn_probability"] == expected["churn_probability"].iloc[i]
+        assert str(single["risk_level"]) == str(expected["risk_level"].iloc[i])
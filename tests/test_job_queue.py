@@ -0,0 +1,73 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from src.pipeline.batch_store import BatchStore, BatchStoreConfig
+from src.pipeline.job_queue import JobQueue, JobQueueConfig, JobWorker
+from src.pipeline.predict_pipeline import PredictPipeline
+
+
+TEST_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Notebook", "data", "test.csv")
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(JobQueueConfig(
+        path=str(tmp_path / "jobs.sqlite"),
+        upload_dir=str(tmp_path / "uploads"),
+        lease_seconds=0.05,
+        chunksize=20
+    ))
+
+
+@pytest.fixture
+def batch_store(tmp_path):
+    return BatchStore(BatchStoreConfig(root=str(tmp_path / "batches")))
+
+
+def submit(queue):
+    job_id = queue.new_id()
+    pd.read_csv(TEST_DATA).to_csv(queue.upload_path(job_id), index=False)
+    queue.submit(job_id)
+    return job_id
+
+
+def test_stale_claim_cannot_update_or_requeue(queue):
+    job_id = submit(queue)
+    first = queue.claim()
+    time.sleep(0.1)
+    second = queue.claim()
+
+    assert (first["attempts"], second["attempts"]) == (1, 2)
+    assert not queue.update(job_id, first["attempts"], rows_done=5)
+    assert not queue.requeue(job_id, first["attempts"])
+    assert queue.update(job_id, second["attempts"], rows_done=7)
+    assert queue.get(job_id)["rows_done"] == 7
+
+
+def test_reclaimed_job_is_left_to_the_new_owner(queue, batch_store):
+    job_id = submit(queue)
+    stale = queue.claim()
+    time.sleep(0.1)
+    current = queue.claim()
+
+    worker = JobWorker(queue, PredictPipeline(cache=None), batch_store)
+    worker.run_job(stale)
+
+    job = queue.get(job_id)
+    assert job["status"] == "running"
+    assert job["attempts"] == current["attempts"]
+    assert os.path.exists(queue.upload_path(job_id))
+    # the stale attempt removed the batch it had created
+    assert batch_store.list() == []
+
+    queue.config.lease_seconds = 300
+    worker.run_job(current)
+
+    job = queue.get(job_id)
+    assert job["status"] == "done"
+    assert job["rows_done"] == len(pd.read_csv(TEST_DATA))
+    assert not os.path.exists(queue.upload_path(job_id))
+    assert [meta["batch_id"] for meta in batch_store.list()] == [job["batch_id"]]
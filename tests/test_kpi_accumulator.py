@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analytics.kpi import ChurnKPI, ChurnKPIAccumulator
+from src.pipeline.fast_path import risk_level_for
+
+
+@pytest.fixture(scope="module")
+def predictions():
+    rng = np.random.default_rng(1)
+    churn_prob = rng.random(1000)
+    churn_prob[[5, 70]] = np.nan
+    return pd.DataFrame({
+        "customer_id": np.arange(1000),
+        "churn_probability": churn_prob,
+        "risk_level": [risk_level_for(p) for p in churn_prob]
+    })
+
+
+def reference_kpis(df):
+    # the original pandas implementation of ChurnKPI.compute_kpis
+    return {
+        "total_customers": len(df),
+        "high_risk_customers": int((df["risk_level"] == "High").sum()),
+        "medium_risk_customers": int((df["risk_level"] == "Medium").sum()),
+        "low_risk_customers": int((df["risk_level"] == "Low").sum()),
+        "average_churn_probability": round(df["churn_probability"].mean(), 4),
+        "maximum_churn_probability": round(df["churn_probability"].max(), 4),
+        "risk_distribution_percent": df["risk_level"].value_counts(normalize=True).mul(100).round(2).to_dict(),
+        "top_risky_customers": df.sort_values(by="churn_probability", ascending=False).head(10)
+    }
+
+
+def assert_same_kpis(kpis, expected):
+    top, expected_top = kpis.pop("top_risky_customers"), expected.pop("top_risky_customers")
+    assert kpis == expected
+    assert top["customer_id"].tolist() == expected_top["customer_id"].tolist()
+    assert list(top.columns) == list(expected_top.columns)
+
+
+def test_chunked_updates_match_the_pandas_kpis(predictions):
+    accumulator = ChurnKPIAccumulator()
+    for start in range(0, len(predictions), 128):
+        accumulator.update(predictions.iloc[start:start + 128])
+    assert_same_kpis(accumulator.compute_kpis(), reference_kpis(predictions))
+
+
+def test_churn_kpi_matches_the_pandas_kpis(predictions):
+    assert_same_kpis(ChurnKPI(predictions).compute_kpis(), reference_kpis(predictions))
+
+
+@pytest.mark.parametrize("split", [0, 1, 333, 999, 1000])
+def test_merge_equals_one_pass(predictions, split):
+    head = ChurnKPIAccumulator().update(predictions.iloc[:split])
+    tail = ChurnKPIAccumulator().update(predictions.iloc[split:])
+    merged = head.merge(tail).compute_kpis()
+    single = ChurnKPIAccumulator().update(predictions).compute_kpis()
+
+    merged_top, single_top = merged.pop("top_risky_customers"), single.pop("top_risky_customers")
+    assert merged == single
+    assert merged_top["customer_id"].tolist() == single_top["customer_id"].tolist()
+
+
+def test_ties_keep_the_earliest_rows_across_merges():
+    df = pd.DataFrame({
+        "customer_id": np.arange(30),
+        "churn_probability": np.full(30, 0.9),
+        "risk_level": "High"
+    })
+    accumulators = [ChurnKPIAccumulator(top_k=5).update(df.iloc[i:i + 10]) for i in (0, 10, 20)]
+    merged = accumulators[0].merge(accumulators[1]).merge(accumulators[2])
+    assert merged.top_risky_customers()["customer_id"].tolist() == [0, 1, 2, 3, 4]
+
+
+def test_empty_input():
+    kpis = ChurnKPIAccumulator().compute_kpis()
+    assert kpis["total_customers"] == 0
+    assert np.isnan(kpis["average_churn_probability"])
+    assert kpis["risk_distribution_percent"] == {}
+    assert kpis["top_risky_customers"].empty
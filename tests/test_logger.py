@@ -0,0 +1,80 @@
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+
+from src.logger import DroppingQueueHandler
+
+
+ROOT = os.path.dirname(os.path.dirname(__file__))
+
+
+def record(message="hello"):
+    return logging.LogRecord("test", logging.INFO, __file__, 1, message, (), None)
+
+
+def test_full_queue_counts_every_dropped_record():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=10))
+
+    def emit_many():
+        for _ in range(1000):
+            handler.handle(record())
+
+    threads = [threading.Thread(target=emit_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert handler.queue.qsize() == 10
+    assert handler.dropped == 8 * 1000 - 10
+
+
+def test_records_are_rendered_before_queueing():
+    handler = DroppingQueueHandler(queue.Queue())
+    handler.handle(logging.LogRecord("test", logging.INFO, __file__, 1, "%s rows", (5,), None))
+    queued = handler.queue.get_nowait()
+    assert queued.msg == "5 rows"
+    assert queued.args is None
+
+
+SCRIPT = """
+import logging, os, sys
+
+seen = []
+class Keep(logging.Handler):
+    def emit(self, record):
+        seen.append(record.getMessage())
+
+logging.getLogger().addHandler(Keep())
+from src.logger import shutdown_logging
+
+logging.info("from the parent")
+pid = os.fork()
+if pid == 0:
+    logging.info("from the child")
+    shutdown_logging()
+    os._exit(0)
+os.waitpid(pid, 0)
+shutdown_logging()
+
+assert seen == ["from the parent"], seen
+print(os.getpid(), pid)
+"""
+
+
+def test_each_process_writes_its_own_file_and_app_handlers_stay(tmp_path):
+    env = {**os.environ, "LOG_DIR": str(tmp_path), "PYTHONPATH": ROOT}
+    out = subprocess.run(
+        [sys.executable, "-c", SCRIPT], env=env, cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    parent, child = out.split()
+
+    with open(tmp_path / f"churn-{parent}.log") as f:
+        parent_log = f.read()
+    with open(tmp_path / f"churn-{child}.log") as f:
+        child_log = f.read()
+    assert "from the parent" in parent_log and "from the child" not in parent_log
+    assert "from the child" in child_log and "from the parent" not in child_log
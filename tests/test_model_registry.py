@@ -0,0 +1,98 @@
+import json
+import os
+import shutil
+import time
+
+import pytest
+
+from src.exeption import CustomException
+from src.utils import load_object, save_object
+from src.pipeline.model_registry import (
+    ARTIFACT_MANIFEST, ModelRegistry, ModelRegistryConfig, write_artifact_manifest
+)
+
+
+ARTIFACTS = os.path.join(os.path.dirname(os.path.dirname(__file__)), "artifacts")
+SERVING_FILES = ["model.pkl", "preprocessor.pkl", "model_native.json", "model.ubj", "preprocessor.npz", ARTIFACT_MANIFEST]
+
+
+@pytest.fixture
+def artifact_dir(tmp_path):
+    for name in SERVING_FILES:
+        shutil.copy(os.path.join(ARTIFACTS, name), tmp_path / name)
+    return tmp_path
+
+
+def make_registry(directory, **overrides):
+    return ModelRegistry(ModelRegistryConfig(
+        model_path=str(directory / "model.pkl"),
+        preprocessor_path=str(directory / "preprocessor.pkl"),
+        native_dir=str(directory),
+        manifest_path=str(directory / ARTIFACT_MANIFEST),
+        check_interval=0,
+        **overrides
+    ))
+
+
+def retrain(directory):
+    # same model, different bytes: enough for a new version
+    model = load_object(str(directory / "model.pkl"))
+    model.set_params(n_jobs=3)
+    save_object(str(directory / "model.pkl"), model)
+    return write_artifact_manifest(str(directory))
+
+
+def wait_for_version(registry, version, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if registry.get().version == version:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.mark.parametrize("artifact_format", ["pickle", "native"])
+def test_version_comes_from_the_manifest(artifact_dir, artifact_format):
+    registry = make_registry(artifact_dir, artifact_format=artifact_format)
+    artifacts = registry.load()
+    with open(artifact_dir / ARTIFACT_MANIFEST) as f:
+        assert artifacts.version == json.load(f)["version"]
+    assert artifacts.compiled_preprocessor is not None
+
+
+def test_hot_reload_swaps_the_snapshot(artifact_dir):
+    registry = make_registry(artifact_dir)
+    before = registry.load()
+
+    version = retrain(artifact_dir)
+    assert version != before.version
+    assert wait_for_version(registry, version)
+
+    after = registry.get()
+    assert after is not before
+    assert after.model.get_params()["n_jobs"] == 3
+    # requests holding the old snapshot keep a working model
+    assert before.model.get_params()["n_jobs"] != 3
+
+
+def test_files_that_do_not_match_the_manifest_are_refused(artifact_dir):
+    with open(artifact_dir / "preprocessor.pkl", "ab") as f:
+        f.write(b"\0")
+
+    with pytest.raises(CustomException, match="does not match"):
+        make_registry(artifact_dir).load()
+
+
+def test_failed_reload_keeps_serving_the_previous_model(artifact_dir):
+    registry = make_registry(artifact_dir)
+    before = registry.load()
+
+    # model replaced but the manifest not rewritten yet, as mid-way through training
+    model = load_object(str(artifact_dir / "model.pkl"))
+    model.set_params(n_jobs=3)
+    save_object(str(artifact_dir / "model.pkl"), model)
+    os.utime(artifact_dir / ARTIFACT_MANIFEST)
+
+    registry.get()
+    time.sleep(0.5)
+    assert registry.get() is before
@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import load_object
+from src.pipeline.fast_path import CompiledPreprocessor
+from src.pipeline.model_registry import ModelRegistry, ModelRegistryConfig
+from src.pipeline.native_model import (
+    NATIVE_PREPROCESSOR, NativeModel, export_native_model, export_native_preprocessor
+)
+from src.pipeline.predict_pipeline import PredictPipeline
+
+
+ARTIFACTS = os.path.join(os.path.dirname(os.path.dirname(__file__)), "artifacts")
+TEST_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Notebook", "data", "test.csv")
+
+
+def _dense(matrix):
+    return matrix.toarray() if hasattr(matrix, "toarray") else np.asarray(matrix)
+
+
+@pytest.fixture(scope="module")
+def preprocessor():
+    return load_object(os.path.join(ARTIFACTS, "preprocessor.pkl"))
+
+
+@pytest.fixture(scope="module")
+def model():
+    return load_object(os.path.join(ARTIFACTS, "model.pkl"))
+
+
+@pytest.fixture(scope="module")
+def frame():
+    df = pd.read_csv(TEST_DATA)
+    extra = pd.DataFrame([
+        {**df.iloc[0].to_dict(), "subscription_plan": None},
+        {**df.iloc[0].to_dict(), "subscription_plan": np.nan},
+        {**df.iloc[0].to_dict(), "subscription_plan": "Platinum"},
+    ])
+    return pd.concat([df, extra], ignore_index=True)
+
+
+def test_exported_preprocessor_matches_sklearn(preprocessor, frame):
+    exported = CompiledPreprocessor.load_npz(os.path.join(ARTIFACTS, NATIVE_PREPROCESSOR))
+    np.testing.assert_allclose(exported.transform(frame), _dense(preprocessor.transform(frame)))
+
+
+def test_native_model_matches_pickle(preprocessor, model, frame):
+    features = _dense(preprocessor.transform(frame))
+    native = NativeModel.load(ARTIFACTS)
+    np.testing.assert_allclose(
+        native.predict_proba(features)[:, 1], model.predict_proba(features)[:, 1], rtol=0, atol=1e-6
+    )
+
+
+def test_export_round_trip(tmp_path, preprocessor, model, frame):
+    export_native_model(model, str(tmp_path))
+    export_native_preprocessor(preprocessor, str(tmp_path))
+
+    features = CompiledPreprocessor.load_npz(str(tmp_path / NATIVE_PREPROCESSOR)).transform(frame)
+    np.testing.assert_allclose(features, _dense(preprocessor.transform(frame)))
+    np.testing.assert_allclose(
+        NativeModel.load(str(tmp_path)).predict_proba(features)[:, 1],
+        model.predict_proba(features)[:, 1],
+        rtol=0, atol=1e-6
+    )
+
+
+def test_native_registry_matches_pickle_registry(frame):
+    native = PredictPipeline(ModelRegistry(ModelRegistryConfig(artifact_format="native")), cache=None)
+    pickled = PredictPipeline(ModelRegistry(ModelRegistryConfig(artifact_format="pickle")), cache=None)
+
+    expected = pickled.predict(frame)
+    np.testing.assert_allclose(
+        native.predict(frame)["churn_probability"], expected["churn_probability"], rtol=0, atol=1e-6
+    )
+    for i, record in enumerate(frame.to_dict(orient="records")):
+        single = native.predict_record(record)
+        assert single["churn_probability"] == pytest.approx(expected["churn_probability"].iloc[i], abs=1e-6)
@@ -0,0 +1,69 @@
+import time
+
+import numpy as np
+
+from src.pipeline.prediction_cache import PredictionCache, PredictionCacheConfig
+
+
+RECORD = {"customer_id": 1, "tenure_months": 12, "subscription_plan": "Pro"}
+
+
+def make_cache(tmp_path=None, **overrides):
+    disk_path = str(tmp_path / "cache.sqlite") if tmp_path is not None else None
+    return PredictionCache(PredictionCacheConfig(disk_path=disk_path, **overrides))
+
+
+def test_key_depends_on_features_and_version():
+    key = PredictionCache.make_key(RECORD, "v1")
+    assert PredictionCache.make_key(dict(reversed(list(RECORD.items()))), "v1") == key
+    assert PredictionCache.make_key({**RECORD, "tenure_months": 13}, "v1") != key
+    assert PredictionCache.make_key(RECORD, "v2") != key
+
+
+def test_new_version_drops_old_entries():
+    cache = make_cache()
+    cache.sync_version("v1")
+    key = cache.make_key(RECORD, "v1")
+    cache.put_many([(key, (np.float32(0.8), "High"))], "v1")
+    assert cache.get_many([key]) == {key: (np.float32(0.8), "High")}
+
+    cache.sync_version("v2")
+    assert cache.get_many([key]) == {}
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_disk_cache_survives_restart_but_not_a_new_version(tmp_path):
+    first = make_cache(tmp_path)
+    first.sync_version("v1")
+    key = first.make_key(RECORD, "v1")
+    first.put_many([(key, (np.float32(0.25), "Low"))], "v1")
+
+    restarted = make_cache(tmp_path)
+    restarted.sync_version("v1")
+    value = restarted.get_many([key])[key]
+    assert value == (np.float32(0.25), "Low")
+    assert type(value[0]) is np.float32
+    assert restarted.stats()["disk_hits"] == 1
+
+    restarted.sync_version("v2")
+    assert make_cache(tmp_path).get_many([key]) == {}
+
+
+def test_entries_expire():
+    cache = make_cache(ttl_seconds=0.05)
+    cache.sync_version("v1")
+    key = cache.make_key(RECORD, "v1")
+    cache.put_many([(key, (0.5, "Medium"))], "v1")
+    time.sleep(0.1)
+    assert cache.get_many([key]) == {}
+
+
+def test_lru_bound():
+    cache = make_cache(max_entries=2)
+    cache.sync_version("v1")
+    keys = [cache.make_key({**RECORD, "customer_id": i}, "v1") for i in range(3)]
+    for key in keys:
+        cache.put_many([(key, (0.1, "Low"))], "v1")
+    assert set(cache.get_many(keys)) == set(keys[1:])
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,83 @@
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from src.pipeline.predict_pipeline import PredictPipeline
+from src.pipeline.score_table import ScoreTable, ScoreTableConfig
+
+
+TEST_DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "Notebook", "data", "test.csv")
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    return PredictPipeline(cache=None)
+
+
+@pytest.fixture
+def table(tmp_path, pipeline):
+    table = ScoreTable(ScoreTableConfig(path=str(tmp_path / "scores.sqlite"), chunksize=16, check_interval=0))
+    table.build(TEST_DATA, pipeline)
+    return table
+
+
+def set_table_version(table, version):
+    with sqlite3.connect(table.config.path) as conn:
+        conn.execute("UPDATE meta SET value = ? WHERE key = 'model_version'", (version,))
+    # a rebuilt file has a new mtime; make sure the reader notices
+    os.utime(table.config.path, ns=(0, os.stat(table.config.path).st_mtime_ns + 1))
+
+
+def test_hits_match_live_scores(table, pipeline):
+    df = pd.read_csv(TEST_DATA)
+    expected = pipeline.predict(df)
+    version = pipeline.registry.get().version
+
+    for i, record in enumerate(df.to_dict(orient="records")):
+        churn_prob, risk_level = table.lookup(record["customer_id"], version, record)
+        assert churn_prob == expected["churn_probability"].iloc[i]
+        assert type(churn_prob) is expected["churn_probability"].dtype.type
+        assert risk_level == expected["risk_level"].iloc[i]
+    assert table.stats()["hits"] == len(df)
+
+
+def test_unknown_customer_is_a_miss(table, pipeline):
+    assert table.lookup(-1, pipeline.registry.get().version) is None
+    assert table.stats()["misses"] == 1
+
+
+def test_changed_features_are_stale(table, pipeline):
+    record = pd.read_csv(TEST_DATA).to_dict(orient="records")[0]
+    changed = {**record, "support_tickets": record["support_tickets"] + 1}
+    assert table.lookup(record["customer_id"], pipeline.registry.get().version, changed) is None
+    assert table.stats()["stale"] == 1
+
+
+def test_other_model_version_is_stale(table, pipeline):
+    customer_id = int(pd.read_csv(TEST_DATA)["customer_id"].iloc[0])
+    set_table_version(table, "an-older-model")
+    assert table.lookup(customer_id, pipeline.registry.get().version) is None
+    assert table.stats()["stale"] == 1
+
+
+def test_api_serves_hits_and_404s_stale_rows(table, monkeypatch):
+    import api.main
+
+    monkeypatch.setattr(api.main, "score_table", table)
+    client = TestClient(api.main.app)
+    record = pd.read_csv(TEST_DATA).to_dict(orient="records")[0]
+    customer_id = record["customer_id"]
+
+    response = client.get(f"/score/{customer_id}")
+    assert response.status_code == 200
+    assert response.json()["source"] == "table"
+
+    set_table_version(table, "an-older-model")
+    assert client.get(f"/score/{customer_id}").status_code == 404
+    # the POST variant scores the record live instead
+    response = client.post(f"/score/{customer_id}", json=record)
+    assert response.status_code == 200
+    assert response.json()["source"] == "live"
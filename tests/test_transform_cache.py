@@ -0,0 +1,81 @@
+import os
+import stat
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse
+from sklearn.preprocessing import StandardScaler
+
+from src.components.transform_cache import TransformCache
+
+
+@pytest.fixture
+def data_paths(tmp_path):
+    paths = []
+    for name, seed in (("train.csv", 0), ("test.csv", 1)):
+        path = tmp_path / name
+        pd.DataFrame(np.random.default_rng(seed).random((20, 3)), columns=list("abc")).to_csv(path, index=False)
+        paths.append(str(path))
+    return paths
+
+
+def entry(seed):
+    X = np.random.default_rng(seed).random((10, 3))
+    return StandardScaler().fit(X), {"X_train": X, "X_test": scipy.sparse.random(4, 3, density=0.5, format="csr")}
+
+
+def test_miss_store_hit(tmp_path, data_paths):
+    cache = TransformCache(str(tmp_path / "cache"))
+    key = cache.make_key(data_paths, "config")
+    assert cache.load(key) is None
+
+    preprocessor, arrays = entry(0)
+    cache.store(key, preprocessor, arrays)
+    loaded = cache.load(key)
+
+    assert loaded is not None
+    cached_preprocessor, cached_arrays = loaded
+    np.testing.assert_array_equal(cached_preprocessor.mean_, preprocessor.mean_)
+    np.testing.assert_array_equal(cached_arrays["X_train"], arrays["X_train"])
+    assert scipy.sparse.issparse(cached_arrays["X_test"])
+    assert (cached_arrays["X_test"] != arrays["X_test"]).nnz == 0
+
+
+def test_key_changes_with_data_and_config(tmp_path, data_paths):
+    cache = TransformCache(str(tmp_path / "cache"))
+    key = cache.make_key(data_paths, "config")
+    assert cache.make_key(data_paths, "config") == key
+    assert cache.make_key(data_paths, "other config") != key
+
+    with open(data_paths[0], "a") as f:
+        f.write("0.5,0.5,0.5\n")
+    changed = cache.make_key(data_paths, "config")
+    assert changed != key
+
+    cache.store(key, *entry(0))
+    assert cache.load(changed) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = TransformCache(str(tmp_path / "cache"), max_entries=2)
+    for key in ("a" * 32, "b" * 32):
+        cache.store(key, *entry(0))
+        time.sleep(0.02)
+
+    # a hit makes "a" the most recent, so "b" goes when "c" arrives
+    assert cache.load("a" * 32) is not None
+    time.sleep(0.02)
+    cache.store("c" * 32, *entry(1))
+
+    assert cache.load("a" * 32) is not None
+    assert cache.load("b" * 32) is None
+    assert cache.load("c" * 32) is not None
+
+
+def test_entries_are_readable_by_others(tmp_path):
+    cache = TransformCache(str(tmp_path / "cache"))
+    cache.store("d" * 32, *entry(0))
+    mode = stat.S_IMODE(os.stat(tmp_path / "cache" / ("d" * 32)).st_mode)
+    assert mode & 0o055 == 0o055
@@ -0,0 +1,136 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def make_session(pool_size: int) -> requests.Session:
+    # keep-alive connections, one per concurrent chunk upload
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def split_csv(data: bytes, rows_per_chunk: int):
+    """
+    Split CSV bytes into chunks of whole lines, each with the header row.
+    Like the batch scorer, assumes no newlines inside quoted fields.
+    """
+    header_end = data.find(b"\n") + 1
+    if header_end == 0:
+        return [data]
+    header, body = data[:header_end], data[header_end:]
+
+    chunks = []
+    start = 0
+    while start < len(body):
+        end = start
+        for _ in range(rows_per_chunk):
+            end = body.find(b"\n", end) + 1
+            if end == 0:
+                end = len(body)
+                break
+        chunks.append(header + body[start:end])
+        start = end
+    return chunks or [data]
+
+
+def _send(session, method: str, url: str, retries: int = 5, timeout: float = 300, **kwargs):
+    for attempt in range(retries + 1):
+        response = session.request(method, url, timeout=timeout, **kwargs)
+        # 503 is the API's backpressure signal, wait as told and resend
+        if response.status_code == 503 and attempt < retries:
+            time.sleep(float(response.headers.get("Retry-After", "1")))
+            continue
+        response.raise_for_status()
+        return response
+
+
+def create_batch(session, api_url: str) -> str:
+    return _send(session, "POST", f"{api_url}/batches").json()["batch_id"]
+
+
+def upload_chunk(session, api_url: str, batch_id: str, index: int, chunk: bytes):
+    return _send(
+        session, "PUT", f"{api_url}/batches/{batch_id}/chunks/{index}",
+        data=chunk, headers={"Content-Type": "text/csv"}
+    ).json()
+
+
+def seal_batch(session, api_url: str, batch_id: str) -> dict:
+    return _send(session, "POST", f"{api_url}/batches/{batch_id}/seal").json()
+
+
+def batch_exists(session, api_url: str, batch_id: str) -> bool:
+    return session.get(f"{api_url}/batches/{batch_id}", timeout=30).status_code == 200
+
+
+def fetch_page(session, api_url: str, batch_id: str, **params):
+    # returns (rows matching the filters, this page as a DataFrame)
+    payload = _send(
+        session, "GET", f"{api_url}/batches/{batch_id}/predictions",
+        params={**params, "orient": "columns"}
+    ).json()
+    return payload["total"], pd.DataFrame(payload["predictions"])
+
+
+def fetch_export(session, api_url: str, batch_id: str, risk_level: str = None) -> bytes:
+    params = {"risk_level": risk_level} if risk_level else {}
+    return _send(session, "GET", f"{api_url}/batches/{batch_id}/export", params=params).content
+
+
+class KPITotals:
+    """Running totals over chunk KPIs, same shape as the API's kpis dict."""
+
+    def __init__(self):
+        self.total_customers = 0
+        self.high_risk_customers = 0
+        self.medium_risk_customers = 0
+        self.low_risk_customers = 0
+        self._probability_sum = 0.0
+
+    def add(self, kpis):
+        self.total_customers += kpis["total_customers"]
+        self.high_risk_customers += kpis["high_risk_customers"]
+        self.medium_risk_customers += kpis["medium_risk_customers"]
+        self.low_risk_customers += kpis["low_risk_customers"]
+        self._probability_sum += kpis["average_churn_probability"] * kpis["total_customers"]
+
+    def as_dict(self):
+        return {
+            "total_customers": self.total_customers,
+            "high_risk_customers": self.high_risk_customers,
+            "medium_risk_customers": self.medium_risk_customers,
+            "low_risk_customers": self.low_risk_customers,
+            "average_churn_probability": (
+                round(self._probability_sum / self.total_customers, 4) if self.total_customers else 0.0
+            )
+        }
+
+
+def upload_csv_chunks(session, api_url: str, batch_id: str, data: bytes, rows_per_chunk: int, concurrency: int):
+    """
+    Score the upload into an open server-side batch as concurrent chunk
+    requests. Yields (done, total, running_kpis, histogram_counts) as each
+    chunk returns; only KPIs and histogram counts come back, not rows.
+    """
+    chunks = split_csv(data, rows_per_chunk)
+    totals = KPITotals()
+    histogram = None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(upload_chunk, session, api_url, batch_id, i, chunk)
+            for i, chunk in enumerate(chunks)
+        ]
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            totals.add(result["kpis"])
+            counts = np.asarray(result["histogram"])
+            histogram = counts if histogram is None else histogram + counts
+            yield done, len(chunks), totals.as_dict(), histogram.tolist()
@@ -8,11 +8,131 @@ from plotly.subplots import make_subplots
 import time
 from datetime import datetime
 import os
+import hashlib
+import importlib.util
+
+from api_client import (
+    make_session, create_batch, upload_csv_chunks, seal_batch,
+    batch_exists, fetch_page, fetch_export
+)
 
 # ===============================
 # FASTAPI CONFIG
 # ===============================
 API_URL = os.getenv("API_URL", "http://localhost:8000")
+# rows per chunk upload and how many requests are in flight at once
+UPLOAD_CHUNK_ROWS = int(os.getenv("UPLOAD_CHUNK_ROWS", "50000"))
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "4"))
+# rows per page in the segment tables; only the page on screen is fetched
+UI_PAGE_ROWS = int(os.getenv("UI_PAGE_ROWS", "100"))
+
+UI_CACHE_ENTRIES = int(os.getenv("UI_CACHE_ENTRIES", "8"))
+
+
+@st.cache_resource
+def get_session():
+    # one pooled keep-alive session for every rerun and every user
+    return make_session(UPLOAD_CONCURRENCY)
+
+
+# Predictions stay in a server-side batch. The upload's sha256 maps to the
+# batch summary; pages and exports are cached per batch id.
+@st.cache_data(max_entries=UI_CACHE_ENTRIES, show_spinner=False)
+def scored_upload(upload_hash, _result=None):
+    # cache-aside: raising on a miss caches nothing, the caller scores with
+    # live progress and calls again with _result to store it
+    if _result is None:
+        raise KeyError(upload_hash)
+    return _result
+
+
+@st.cache_data(max_entries=UI_CACHE_ENTRIES * 16, show_spinner=False)
+def batch_page(batch_id, risk_level, offset, limit):
+    return fetch_page(
+        get_session(), API_URL, batch_id,
+        risk_level=risk_level, offset=offset, limit=limit
+    )
+
+
+def export_extension(format_type):
+    if format_type == "Excel" and importlib.util.find_spec("openpyxl") is not None:
+        return "xlsx"
+    return "csv"
+
+
+@st.cache_data(max_entries=UI_CACHE_ENTRIES, show_spinner=False)
+def export_bytes(batch_id, name, format_type, risk_level=None, _df=None):
+    if _df is None:
+        csv = fetch_export(get_session(), API_URL, batch_id, risk_level)
+        if export_extension(format_type) == "csv":
+            return csv
+        _df = pd.read_csv(io.BytesIO(csv))
+    if export_extension(format_type) == "csv":
+        return _df.to_csv(index=False).encode("utf-8")
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        _df.to_excel(writer, index=False, sheet_name='Predictions')
+    return buffer.getvalue()
+
+
+def histogram_figure(counts, height):
+    # counts are equal-width bins over [0, 1], computed by the API
+    width = 1.0 / len(counts)
+    return go.Figure(go.Bar(
+        x=[(i + 0.5) * width for i in range(len(counts))],
+        y=counts,
+        width=width,
+        marker_color="#6366f1",
+        name="Distribution"
+    )).update_layout(
+        template="plotly_dark",
+        height=height,
+        bargap=0.02,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+
+
+def score_with_live_progress(data):
+    # live view while chunks come back; replaced by the full dashboard
+    session = get_session()
+    batch_id = create_batch(session, API_URL)
+    live = st.empty()
+    last_render = 0.0
+
+    try:
+        for done, total, running_kpis, histogram in upload_csv_chunks(
+            session, API_URL, batch_id, data, UPLOAD_CHUNK_ROWS, UPLOAD_CONCURRENCY
+        ):
+            if done < total and time.monotonic() - last_render < 0.5:
+                continue
+            last_render = time.monotonic()
+
+            with live.container():
+                st.progress(done / total, text=f"🚀 Scored {done} of {total} chunks")
+                p1, p2, p3, p4 = st.columns(4)
+                p1.metric("👥 Scored so far", f"{running_kpis['total_customers']:,}")
+                p2.metric("🔴 High Risk", f"{running_kpis['high_risk_customers']:,}")
+                p3.metric("🟡 Medium Risk", f"{running_kpis['medium_risk_customers']:,}")
+                p4.metric("📈 Avg Churn Prob.", f"{running_kpis['average_churn_probability']:.1%}")
+                st.plotly_chart(histogram_figure(histogram, 300), use_container_width=True, key=f"partial_hist_{done}")
+    finally:
+        live.empty()
+
+    # joins the chunks server-side and returns exact KPIs over all rows
+    return seal_batch(session, API_URL, batch_id)
+
+
+def show_batch_page(batch_id, risk_level, total, key):
+    # one page of the server-side sort index, highest churn probability first
+    pages = max(1, -(-total // UI_PAGE_ROWS))
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, value=1, key=key)
+    _, rows = batch_page(batch_id, risk_level, (page - 1) * UI_PAGE_ROWS, UI_PAGE_ROWS)
+    st.dataframe(rows, width='stretch')
+    first = (page - 1) * UI_PAGE_ROWS
+    st.caption(f"Showing {first + 1:,}–{first + len(rows):,} of {total:,}")
 
 
 # ===============================
@@ -172,20 +292,26 @@ uploaded_file = st.file_uploader("Upload Customer CSV", type=["csv"])
 # ===============================
 if uploaded_file is not None:
 
-    with st.spinner("🚀 Calling FastAPI for predictions..."):
-        response = requests.post(
-            f"{API_URL}/predict_csv",
-            files={"file": uploaded_file}
-        )
-
-    if response.status_code != 200:
-        st.error("❌ FastAPI request failed")
-        st.stop()
-
-    result = response.json()
-
-    predictions = pd.DataFrame(result["predictions"])
-    kpis = result["kpis"]
+    data = uploaded_file.getvalue()
+    upload_hash = hashlib.sha256(data).hexdigest()
+
+    try:
+        batch = scored_upload(upload_hash)
+        if not batch_exists(get_session(), API_URL, batch["batch_id"]):
+            # the API restarted or pruned it; score this upload again
+            scored_upload.clear(upload_hash)
+            raise KeyError(upload_hash)
+    except KeyError:
+        try:
+            batch = score_with_live_progress(data)
+        except requests.RequestException as e:
+            st.error(f"❌ FastAPI request failed: {e}")
+            st.stop()
+        scored_upload(upload_hash, _result=batch)
+
+    batch_id = batch["batch_id"]
+    kpis = batch["kpis"]
+    stats = batch["probability_stats"]
 
     st.success("✅ Prediction completed successfully")
 
@@ -225,19 +351,19 @@ if uploaded_file is not None:
         with adv_col1:
             st.metric(
                 "📌 Max Churn Risk",
-                f"{predictions['churn_probability'].max():.1%}",
+                f"{stats['max']:.1%}",
                 "Highest risk detected"
             )
         
         with adv_col2:
             st.metric(
                 "✅ Min Churn Risk",
-                f"{predictions['churn_probability'].min():.1%}",
+                f"{stats['min']:.1%}",
                 "Lowest risk detected"
             )
         
         with adv_col3:
-            std_dev = predictions['churn_probability'].std()
+            std_dev = stats['std']
             st.metric(
                 "📊 Risk Std Dev",
                 f"{std_dev:.3f}",
@@ -245,7 +371,7 @@ if uploaded_file is not None:
             )
         
         with adv_col4:
-            median_risk = predictions['churn_probability'].median()
+            median_risk = stats['median']
             st.metric(
                 "🎯 Median Risk",
                 f"{median_risk:.1%}",
@@ -262,20 +388,10 @@ if uploaded_file is not None:
     # Churn Distribution Histogram
     with chart_col1:
         st.markdown("#### Churn Probability Distribution")
-        fig_hist = go.Figure()
-        fig_hist.add_trace(go.Histogram(
-            x=predictions["churn_probability"],
-            nbinsx=30,
-            marker_color="#6366f1",
-            name="Distribution"
-        ))
+        fig_hist = histogram_figure(batch["histogram"]["counts"], 400)
         fig_hist.update_layout(
-            template="plotly_dark",
             xaxis_title="Churn Probability",
             yaxis_title="Number of Customers",
-            height=400,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
             hovermode='x unified'
         )
         st.plotly_chart(fig_hist, use_container_width=True, key='histogram')
@@ -339,43 +455,38 @@ if uploaded_file is not None:
         
         with segment_tabs[0]:
             st.markdown("### 🔴 High Risk Customers")
-            high_risk_df = predictions[predictions["risk_level"] == "High"]
+            high_count = kpis['high_risk_customers']
             
-            if high_risk_df.empty:
+            if high_count == 0:
                 st.success("✨ No high-risk customers detected!")
             else:
-                st.markdown(f"**Total:** {len(high_risk_df)} customers ({len(high_risk_df)/len(predictions)*100:.1f}%)")
-                high_risk_sorted = high_risk_df.sort_values(by="churn_probability", ascending=False)
-                st.dataframe(high_risk_sorted, width='stretch')
+                st.markdown(f"**Total:** {high_count} customers ({high_count/kpis['total_customers']*100:.1f}%)")
+                show_batch_page(batch_id, "High", high_count, key="page_high")
         
         with segment_tabs[1]:
             st.markdown("### 🟡 Medium Risk Customers")
-            medium_risk_df = predictions[predictions["risk_level"] == "Medium"]
+            medium_count = kpis['medium_risk_customers']
             
-            if medium_risk_df.empty:
+            if medium_count == 0:
                 st.info("No medium-risk customers detected.")
             else:
-                st.markdown(f"**Total:** {len(medium_risk_df)} customers ({len(medium_risk_df)/len(predictions)*100:.1f}%)")
-                medium_risk_sorted = medium_risk_df.sort_values(by="churn_probability", ascending=False)
-                st.dataframe(medium_risk_sorted, width='stretch')
+                st.markdown(f"**Total:** {medium_count} customers ({medium_count/kpis['total_customers']*100:.1f}%)")
+                show_batch_page(batch_id, "Medium", medium_count, key="page_medium")
         
         with segment_tabs[2]:
             st.markdown("### 🟢 Low Risk Customers")
-            low_risk_df = predictions[predictions["risk_level"] == "Low"]
+            low_count = kpis['low_risk_customers']
             
-            if low_risk_df.empty:
+            if low_count == 0:
                 st.info("No low-risk customers detected.")
             else:
-                st.markdown(f"**Total:** {len(low_risk_df)} customers ({len(low_risk_df)/len(predictions)*100:.1f}%)")
-                low_risk_sorted = low_risk_df.sort_values(by="churn_probability", ascending=False)
-                st.dataframe(low_risk_sorted.head(50), width='stretch')
-                if len(low_risk_sorted) > 50:
-                    st.caption(f"Showing 50 of {len(low_risk_sorted)} low-risk customers")
+                st.markdown(f"**Total:** {low_count} customers ({low_count/kpis['total_customers']*100:.1f}%)")
+                show_batch_page(batch_id, "Low", low_count, key="page_low")
         
         with segment_tabs[3]:
             st.markdown("### 📋 All Customers")
-            st.markdown(f"**Total:** {len(predictions)} customers")
-            st.dataframe(predictions.sort_values(by="churn_probability", ascending=False), width='stretch')
+            st.markdown(f"**Total:** {kpis['total_customers']} customers")
+            show_batch_page(batch_id, None, batch["rows"], key="page_all")
 
     # ===============================
     # DOWNLOAD SECTION - Enhanced
@@ -384,47 +495,34 @@ if uploaded_file is not None:
     st.markdown("<h2>💾 EXPORT & DOWNLOAD</h2>", unsafe_allow_html=True)
     st.markdown("Download predictions and segmented data for further analysis", unsafe_allow_html=True)
     
-    # Helper function to export data
-    def export_data(df, format_type="CSV"):
-        if format_type == "CSV":
-            return df.to_csv(index=False).encode("utf-8"), "csv"
-        else:  # Excel
-            try:
-                import openpyxl
-                buffer = io.BytesIO()
-                with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                    df.to_excel(writer, index=False, sheet_name='Predictions')
-                return buffer.getvalue(), "xlsx"
-            except:
-                return df.to_csv(index=False).encode("utf-8"), "csv"
+    # exports are fetched on click (callable data) and cached per batch and format
+    ext = export_extension(export_format)
+    export_mime = "text/csv" if ext == "csv" else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     
     download_col1, download_col2, download_col3 = st.columns(3)
     
     with download_col1:
         st.markdown("**📥 Full Dataset**")
-        csv_data, ext = export_data(predictions, export_format)
         st.download_button(
             label="Download All Predictions",
-            data=csv_data,
+            data=lambda: export_bytes(batch_id, "all", export_format),
             file_name=f"churn_predictions_all.{ext}",
-            mime=f"text/csv" if ext == "csv" else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            mime=export_mime,
             key="download_all"
         )
-        st.caption(f"📊 {len(predictions):,} records")
+        st.caption(f"📊 {batch['rows']:,} records")
     
     with download_col2:
         st.markdown("**🔴 High Risk Only**")
-        high_risk_data = predictions[predictions["risk_level"] == "High"]
-        if len(high_risk_data) > 0:
-            csv_data, ext = export_data(high_risk_data, export_format)
+        if kpis['high_risk_customers'] > 0:
             st.download_button(
                 label="Download High Risk",
-                data=csv_data,
+                data=lambda: export_bytes(batch_id, "high", export_format, risk_level="High"),
                 file_name=f"churn_high_risk.{ext}",
-                mime=f"text/csv" if ext == "csv" else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                mime=export_mime,
                 key="download_high"
             )
-            st.caption(f"📊 {len(high_risk_data):,} records")
+            st.caption(f"📊 {kpis['high_risk_customers']:,} records")
         else:
             st.info("No high-risk customers")
     
@@ -440,12 +538,11 @@ if uploaded_file is not None:
                 f"{kpis['average_churn_probability']:.2%}"
             ]
         })
-        csv_data, ext = export_data(summary_df, export_format)
         st.download_button(
             label="Download Summary",
-            data=csv_data,
+            data=lambda: export_bytes(batch_id, "summary", export_format, _df=summary_df),
             file_name=f"churn_summary.{ext}",
-            mime=f"text/csv" if ext == "csv" else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            mime=export_mime,
             key="download_summary"
         )
         st.caption("Executive summary")
@@ -457,16 +554,17 @@ if uploaded_file is not None:
     # ===============================
     st.markdown("<div class='section-header'><h2>🔴 IMMEDIATE ACTIONS REQUIRED</h2></div>", unsafe_allow_html=True)
 
-    high_risk_df = predictions[predictions["risk_level"] == "High"]
+    high_count = kpis['high_risk_customers']
 
-    if high_risk_df.empty:
+    if high_count == 0:
         st.success("✨ Excellent! No high-risk customers detected. 🎉")
     else:
-        st.warning(f"⚠️ {len(high_risk_df)} customers require immediate attention")
-        high_risk_display = high_risk_df.sort_values(by="churn_probability", ascending=False).head(10)
-        st.dataframe(high_risk_display, width='stretch')
-        if len(high_risk_df) > 10:
-            st.caption(f"Showing top 10 of {len(high_risk_df)} high-risk customers")
+        st.warning(f"⚠️ {high_count} customers require immediate attention")
+        # top 10 is the first page of the server's sort index
+        _, top_high = batch_page(batch_id, "High", 0, 10)
+        st.dataframe(top_high, width='stretch')
+        if high_count > 10:
+            st.caption(f"Showing top 10 of {high_count} high-risk customers")
 
 else:
     st.info("Upload a CSV file to begin analysis.")